@@ -1,5 +1,5 @@
-import colorsys
 import cv2
+import numpy as np
 from PIL import Image
 
 from .LivescoreBase import LivescoreBase
@@ -7,6 +7,28 @@ from .details import Alliance2017, OngoingMatchDetails
 
 
 class Livescore2017(LivescoreBase):
+    _PROBES = {
+        'mode': [(497, 70), (581, 70)],
+        'color': [(496, 95)],
+        'left_fuel': [
+            (355, 107), (348, 86), (332, 70), (312, 64), (289, 70), (273, 86), (264, 107), (272, 130), (289, 146),
+        ],
+        'right_fuel': [
+            (925, 107), (930, 86), (944, 70), (967, 64), (991, 70), (1007, 86), (1015, 107), (1007, 130), (991, 146),
+        ],
+    }
+    _ROIS = {
+        'time': ((617, 55), (667, 81), False),
+        'left_score': ((496, 90), (634, 152), True),
+        'right_score': ((644, 90), (784, 152), True),
+        'left_fuel_score': ((316, 123), (362, 152), False),
+        'right_fuel_score': ((916, 123), (963, 152), False),
+        'left_rotors': ((210, 123), (230, 148), False),
+        'right_rotors': ((1048, 123), (1068, 148), False),
+        'left_touchpads': ((100, 123), (120, 148), False),
+        'right_touchpads': ((1158, 123), (1178, 148), False),
+    }
+
     def __init__(self, **kwargs) -> object:
         super(Livescore2017, self).__init__(2017, **kwargs)
         self._match_key = None
@@ -30,64 +52,47 @@ class Livescore2017(LivescoreBase):
 
         return self._match_key, self._match_name
 
-    def _getTimeAndMode(self, img, debug_img):
+    def _getTimeAndMode(self, img, debug_img, probes, rois):
         # Find time remaining
-        tl = self._transformPoint((617, 55))
-        br = self._transformPoint((667, 81))
-        time_remaining = self._parseDigits(self._getImgCropThresh(img, tl, br))
+        time_remaining = self._readDigits(rois, 'time')
 
         # Determine mode: 'pre_match', 'auto', 'teleop', or 'post_match'
-        mode_point = self._transformPoint((497, 70))
-        mode_point2 = self._transformPoint((581, 70))
-        mode_sample = img[mode_point[1], mode_point[0], :]
-        mode_sample2 = img[mode_point2[1], mode_point2[0], :]
-
-        hsv = colorsys.rgb_to_hsv(float(mode_sample[2])/255, float(mode_sample[1])/255, float(mode_sample[0])/255)
-        hsv2 = colorsys.rgb_to_hsv(float(mode_sample2[2])/255, float(mode_sample2[1])/255, float(mode_sample2[0])/255)
+        mode_saturated = probes.isSaturated('mode', 0.6)
 
         if time_remaining is None:
             mode = None
         if time_remaining == 0:
-            if hsv[1] > 0.6 and hsv2[1] > 0.6:  # Both saturated
+            if mode_saturated.all():  # Both saturated
                 mode = 'post_match'
-            elif hsv[1] > 0.6:  # First saturated
+            elif mode_saturated[0]:  # First saturated
                 mode = 'auto'  # End of auton
             else:
                 mode = 'pre_match'
-        elif time_remaining <= 15 and hsv2[1] < 0.6:
+        elif time_remaining <= 15 and not mode_saturated[1]:
             mode = 'auto'
         else:
             mode = 'teleop'
 
         if self._debug:
-            box = self._cornersToBox(tl, br)
+            box = self._cornersToBox(*rois.getCorners('time'))
             self._drawBox(debug_img, box, (0, 255, 0))
-            cv2.circle(debug_img, mode_point, 2, (0, 255, 0), -1)
-            cv2.circle(debug_img, mode_point2, 2, (0, 255, 0), -1)
+            for point in probes.getPoints('mode'):
+                cv2.circle(debug_img, point, 2, (0, 255, 0), -1)
 
         return time_remaining, mode
 
-    def _getFlipped(self, img, debug_img):
+    def _getFlipped(self, img, debug_img, probes):
         # Sample point to determine red/blue side
-        color_point = self._transformPoint((496, 95))
-        color_sample = img[color_point[1], color_point[0], :]
-        is_flipped = color_sample[0] > color_sample[2]  # More blue than red
+        is_flipped = bool(probes.isBlue('color')[0])
 
         if self._debug:
-            cv2.circle(debug_img, color_point, 2, (0, 255, 0), -1)
+            cv2.circle(debug_img, probes.getPoints('color')[0], 2, (0, 255, 0), -1)
 
         return is_flipped
 
-    def _getScores(self, img, debug_img, is_flipped):
-        # Left score limits
-        left_tl = self._transformPoint((496, 90))
-        left_br = self._transformPoint((634, 152))
-        # Right score limits
-        right_tl = self._transformPoint((644, 90))
-        right_br = self._transformPoint((784, 152))
-
-        left_score = self._parseDigits(self._getImgCropThresh(img, left_tl, left_br, white=True))
-        right_score = self._parseDigits(self._getImgCropThresh(img, right_tl, right_br, white=True))
+    def _getScores(self, img, debug_img, rois, is_flipped):
+        left_score = self._readDigits(rois, 'left_score')
+        right_score = self._readDigits(rois, 'right_score')
 
         if is_flipped:
             red_score = right_score
@@ -97,65 +102,20 @@ class Livescore2017(LivescoreBase):
             blue_score = right_score
 
         if self._debug:
-            left_box = self._cornersToBox(left_tl, left_br)
-            right_box = self._cornersToBox(right_tl, right_br)
+            left_box = self._cornersToBox(*rois.getCorners('left_score'))
+            right_box = self._cornersToBox(*rois.getCorners('right_score'))
             self._drawBox(debug_img, left_box, (255, 255, 0) if is_flipped else (255, 0, 255))
             self._drawBox(debug_img, right_box, (255, 0, 255) if is_flipped else (255, 255, 0))
 
         return red_score, blue_score
 
-    def _getFuelScores(self, img, debug_img, is_flipped):
-        # Left fuel score
-        left_tl = self._transformPoint((316, 123))
-        left_br = self._transformPoint((362, 152))
-        # Left fuel count
-        left_fuel_locs = [
-            self._transformPoint((355, 107)),
-            self._transformPoint((348, 86)),
-            self._transformPoint((332, 70)),
-            self._transformPoint((312, 64)),
-            self._transformPoint((289, 70)),
-            self._transformPoint((273, 86)),
-            self._transformPoint((264, 107)),
-            self._transformPoint((272, 130)),
-            self._transformPoint((289, 146)),
-        ]
-        # Right fuel score
-        right_tl = self._transformPoint((916, 123))
-        right_br = self._transformPoint((963, 152))
-        # Right fuel count
-        right_fuel_locs = [
-            self._transformPoint((925, 107)),
-            self._transformPoint((930, 86)),
-            self._transformPoint((944, 70)),
-            self._transformPoint((967, 64)),
-            self._transformPoint((991, 70)),
-            self._transformPoint((1007, 86)),
-            self._transformPoint((1015, 107)),
-            self._transformPoint((1007, 130)),
-            self._transformPoint((991, 146)),
-        ]
-
-        left_fuel_score = self._parseDigits(self._getImgCropThresh(img, left_tl, left_br))
-        right_fuel_score = self._parseDigits(self._getImgCropThresh(img, right_tl, right_br))
-
-        left_fuel_count = 0
-        for x, y in left_fuel_locs:
-            bgr = img[y, x, :]
-            hsv = colorsys.rgb_to_hsv(float(bgr[2])/255, float(bgr[1])/255, float(bgr[0])/255)
-            if hsv[1] > 0.2:
-                left_fuel_count += 1
-            else:
-                break
-
-        right_fuel_count = 0
-        for x, y in right_fuel_locs:
-            bgr = img[y, x, :]
-            hsv = colorsys.rgb_to_hsv(float(bgr[2])/255, float(bgr[1])/255, float(bgr[0])/255)
-            if hsv[1] > 0.2:
-                right_fuel_count += 1
-            else:
-                break
+    def _getFuelScores(self, img, debug_img, probes, rois, is_flipped):
+        left_fuel_score = self._readDigits(rois, 'left_fuel_score')
+        right_fuel_score = self._readDigits(rois, 'right_fuel_score')
+
+        # Fuel count is the number of saturated points before the first unsaturated one along each arc
+        left_fuel_count = int(np.cumprod(probes.isSaturated('left_fuel', 0.2)).sum())
+        right_fuel_count = int(np.cumprod(probes.isSaturated('right_fuel', 0.2)).sum())
 
         if is_flipped:
             red_fuel_score = right_fuel_score
@@ -171,26 +131,21 @@ class Livescore2017(LivescoreBase):
         if self._debug:
             left_color = (255, 255, 0) if is_flipped else (255, 0, 255)
             right_color = (255, 0, 255) if is_flipped else (255, 255, 0)
-            left_box = self._cornersToBox(left_tl, left_br)
-            right_box = self._cornersToBox(right_tl, right_br)
+            left_box = self._cornersToBox(*rois.getCorners('left_fuel_score'))
+            right_box = self._cornersToBox(*rois.getCorners('right_fuel_score'))
             self._drawBox(debug_img, left_box, left_color)
             self._drawBox(debug_img, right_box, right_color)
-            for point in left_fuel_locs:
+            for point in probes.getPoints('left_fuel'):
                 cv2.circle(debug_img, point, 2, left_color, -1)
-            for point in right_fuel_locs:
+            for point in probes.getPoints('right_fuel'):
                 cv2.circle(debug_img, point, 2, right_color, -1)
 
 
         return red_fuel_score, red_fuel_count, blue_fuel_score, blue_fuel_count
 
-    def _getRotors(self, img, debug_img, is_flipped):
-        left_tl = self._transformPoint((210, 123))
-        left_br = self._transformPoint((230, 148))
-        right_tl = self._transformPoint((1048, 123))
-        right_br = self._transformPoint((1068, 148))
-
-        left_rotors = self._parseDigits(self._getImgCropThresh(img, left_tl, left_br))
-        right_rotors = self._parseDigits(self._getImgCropThresh(img, right_tl, right_br))
+    def _getRotors(self, img, debug_img, rois, is_flipped):
+        left_rotors = self._readDigits(rois, 'left_rotors')
+        right_rotors = self._readDigits(rois, 'right_rotors')
 
         if is_flipped:
             red_rotors = right_rotors
@@ -202,21 +157,16 @@ class Livescore2017(LivescoreBase):
         if self._debug:
             left_color = (255, 255, 0) if is_flipped else (255, 0, 255)
             right_color = (255, 0, 255) if is_flipped else (255, 255, 0)
-            left_box = self._cornersToBox(left_tl, left_br)
-            right_box = self._cornersToBox(right_tl, right_br)
+            left_box = self._cornersToBox(*rois.getCorners('left_rotors'))
+            right_box = self._cornersToBox(*rois.getCorners('right_rotors'))
             self._drawBox(debug_img, left_box, left_color)
             self._drawBox(debug_img, right_box, right_color)
 
         return red_rotors, blue_rotors
 
-    def _getTouchpads(self, img, debug_img, is_flipped):
-        left_tl = self._transformPoint((100, 123))
-        left_br = self._transformPoint((120, 148))
-        right_tl = self._transformPoint((1158, 123))
-        right_br = self._transformPoint((1178, 148))
-
-        left_touchpads = self._parseDigits(self._getImgCropThresh(img, left_tl, left_br))
-        right_touchpads = self._parseDigits(self._getImgCropThresh(img, right_tl, right_br))
+    def _getTouchpads(self, img, debug_img, rois, is_flipped):
+        left_touchpads = self._readDigits(rois, 'left_touchpads')
+        right_touchpads = self._readDigits(rois, 'right_touchpads')
 
         if is_flipped:
             red_touchpads = right_touchpads
@@ -228,8 +178,8 @@ class Livescore2017(LivescoreBase):
         if self._debug:
             left_color = (255, 255, 0) if is_flipped else (255, 0, 255)
             right_color = (255, 0, 255) if is_flipped else (255, 255, 0)
-            left_box = self._cornersToBox(left_tl, left_br)
-            right_box = self._cornersToBox(right_tl, right_br)
+            left_box = self._cornersToBox(*rois.getCorners('left_touchpads'))
+            right_box = self._cornersToBox(*rois.getCorners('right_touchpads'))
             self._drawBox(debug_img, left_box, left_color)
             self._drawBox(debug_img, right_box, right_color)
 
@@ -238,18 +188,21 @@ class Livescore2017(LivescoreBase):
     def _getMatchDetails(self, img, force_find_overlay):
         debug_img = None
         if self._debug:
-            debug_img = img.copy()
+            debug_img = self._getDebugImage(img)
 
-        time_remaining, mode = self._getTimeAndMode(img, debug_img)
+        probes = self._sampleProbes(img)
+        rois = self._getRoisThresh(img)
+        time_remaining, mode = self._getTimeAndMode(img, debug_img, probes, rois)
         if self._is_new_overlay or force_find_overlay:
             self._match_key = None
         match_key, match_name = self._getMatchKeyName(img, debug_img)
 
-        is_flipped = self._getFlipped(img, debug_img)
-        red_score, blue_score = self._getScores(img, debug_img, is_flipped)
-        red_fuel_score, red_fuel_count, blue_fuel_score, blue_fuel_count = self._getFuelScores(img, debug_img, is_flipped)
-        red_rotors, blue_rotors = self._getRotors(img, debug_img, is_flipped)
-        red_touchpads, blue_touchpads = self._getTouchpads(img, debug_img, is_flipped)
+        is_flipped = self._getFlipped(img, debug_img, probes)
+        red_score, blue_score = self._getScores(img, debug_img, rois, is_flipped)
+        red_fuel_score, red_fuel_count, blue_fuel_score, blue_fuel_count = self._getFuelScores(
+            img, debug_img, probes, rois, is_flipped)
+        red_rotors, blue_rotors = self._getRotors(img, debug_img, rois, is_flipped)
+        red_touchpads, blue_touchpads = self._getTouchpads(img, debug_img, rois, is_flipped)
 
         if self._debug:
             cv2.imshow("ROIs", debug_img)
@@ -1,4 +1,3 @@
-import colorsys
 import cv2
 from PIL import Image
 import pkg_resources
@@ -8,6 +7,34 @@ from .details import Alliance2018, OngoingMatchDetails
 
 
 class Livescore2018(LivescoreBase):
+    _PROBES = {
+        'review': [(624, 50), (1279 - 624, 50)],
+        'mode': [(497, 15), (581, 15)],
+        'color': [(496, 52)],
+        # Played: boost, force, levitate
+        'left_played': [(198, 84), (40, 84), (99, 44)],
+        'right_played': [(1279 - 40, 84), (1279 - 198, 84), (1279 - 99, 44)],
+        # Owned: switch, scale
+        'left_owned': [(257, 76), (257, 51)],
+        'right_owned': [(1279 - 257, 76), (1279 - 257, 51)],
+        'powerup_owner': [(631, 107), (1279 - 631, 107)],
+        # Auto quest, face the boss
+        'left_auto_boss': [(550, 54), (580, 54)],
+        'right_auto_boss': [(700, 54), (730, 54)],
+    }
+    _ROIS = {
+        'time': ((617, 14), (665, 38), False),
+        'left_score': ((497, 61), (618, 114), True),
+        'right_score': ((661, 61), (779, 114), True),
+        'left_force': ((75, 83), (93, 106), False),
+        'left_boost': ((145, 83), (163, 106), False),
+        'left_levitate': ((110, 65), (127, 86), False),
+        'right_force': ((1279 - 163, 83), (1279 - 145, 106), False),
+        'right_boost': ((1279 - 93, 83), (1279 - 75, 106), False),
+        'right_levitate': ((1279 - 128, 65), (1279 - 110, 86), False),
+        'powerup_time': ((624, 50), (1279 - 624, 79), True),
+    }
+
     def __init__(self, **kwargs):
         super(Livescore2018, self).__init__(2018, **kwargs)
         self._match_key = None
@@ -39,75 +66,52 @@ class Livescore2018(LivescoreBase):
 
         return self._match_key, self._match_name
 
-    def _getTimeAndMode(self, img, debug_img):
+    def _getTimeAndMode(self, img, debug_img, probes, rois):
         # Check for match under review
-        review_point1 = self._transformPoint((624, 50))
-        review_sample1 = img[review_point1[1], review_point1[0], :]
-        hsvL = colorsys.rgb_to_hsv(float(review_sample1[2])/255, float(review_sample1[1])/255, float(review_sample1[0])/255)
-        review_point2 = self._transformPoint((1279 - 624, 50))
-        review_sample2 = img[review_point2[1], review_point2[0], :]
-        hsvR = colorsys.rgb_to_hsv(float(review_sample2[2])/255, float(review_sample2[1])/255, float(review_sample2[0])/255)
-        if hsvL[0] > 0.116 and hsvL[0] < 0.216 and hsvR[0] > 0.116 and hsvR[0] < 0.216:
+        if probes.isHueInRange('review', self._YELLOW_HUE_LOW, self._YELLOW_HUE_HIGH).all():
             return 0, 'post_match'
 
         # Find time remaining
-        tl = self._transformPoint((617, 14))
-        br = self._transformPoint((665, 38))
-        time_remaining = self._parseDigits(self._getImgCropThresh(img, tl, br))
+        time_remaining = self._readDigits(rois, 'time')
 
         # Determine mode: 'pre_match', 'auto', 'teleop', or 'post_match'
-        mode_point = self._transformPoint((497, 15))
-        mode_point2 = self._transformPoint((581, 15))
-        mode_sample = img[mode_point[1], mode_point[0], :]
-        mode_sample2 = img[mode_point2[1], mode_point2[0], :]
-
-        hsv1 = colorsys.rgb_to_hsv(float(mode_sample[2])/255, float(mode_sample[1])/255, float(mode_sample[0])/255)
-        hsv2 = colorsys.rgb_to_hsv(float(mode_sample2[2])/255, float(mode_sample2[1])/255, float(mode_sample2[0])/255)
+        mode_saturated = probes.isSaturated('mode', 0.6)
 
         if time_remaining is None:
             return None, None
 
         if time_remaining == 0:
-            if hsv1[1] > 0.6 and hsv2[1] > 0.6:  # Both saturated
+            if mode_saturated.all():  # Both saturated
                 mode = 'post_match'
-            elif hsv1[1] > 0.6:  # First saturated
+            elif mode_saturated[0]:  # First saturated
                 mode = 'auto'  # End of auton
             else:
                 mode = 'pre_match'
-        elif time_remaining <= 15 and hsv2[1] < 0.6:
+        elif time_remaining <= 15 and not mode_saturated[1]:
             mode = 'auto'
         else:
             mode = 'teleop'
 
         if self._debug:
-            box = self._cornersToBox(tl, br)
+            box = self._cornersToBox(*rois.getCorners('time'))
             self._drawBox(debug_img, box, (0, 255, 0))
-            cv2.circle(debug_img, mode_point, 2, (0, 255, 0), -1)
-            cv2.circle(debug_img, mode_point2, 2, (0, 255, 0), -1)
+            for point in probes.getPoints('mode'):
+                cv2.circle(debug_img, point, 2, (0, 255, 0), -1)
 
         return time_remaining, mode
 
-    def _getFlipped(self, img, debug_img):
+    def _getFlipped(self, img, debug_img, probes):
         # Sample point to determine red/blue side
-        color_point = self._transformPoint((496, 52))
-        color_sample = img[color_point[1], color_point[0], :]
-        is_flipped = color_sample[0] > color_sample[2]  # More blue than red
+        is_flipped = bool(probes.isBlue('color')[0])
 
         if self._debug:
-            cv2.circle(debug_img, color_point, 2, (0, 255, 0), -1)
+            cv2.circle(debug_img, probes.getPoints('color')[0], 2, (0, 255, 0), -1)
 
         return is_flipped
 
-    def _getScores(self, img, debug_img, is_flipped):
-        # Left score limits
-        left_tl = self._transformPoint((497, 61))
-        left_br = self._transformPoint((618, 114))
-        # Right score limits
-        right_tl = self._transformPoint((661, 61))
-        right_br = self._transformPoint((779, 114))
-
-        left_score = self._parseDigits(self._getImgCropThresh(img, left_tl, left_br, white=True))
-        right_score = self._parseDigits(self._getImgCropThresh(img, right_tl, right_br, white=True))
+    def _getScores(self, img, debug_img, rois, is_flipped):
+        left_score = self._readDigits(rois, 'left_score')
+        right_score = self._readDigits(rois, 'right_score')
 
         if is_flipped:
             red_score = right_score
@@ -117,51 +121,25 @@ class Livescore2018(LivescoreBase):
             blue_score = right_score
 
         if self._debug:
-            left_box = self._cornersToBox(left_tl, left_br)
-            right_box = self._cornersToBox(right_tl, right_br)
+            left_box = self._cornersToBox(*rois.getCorners('left_score'))
+            right_box = self._cornersToBox(*rois.getCorners('right_score'))
             self._drawBox(debug_img, left_box, (255, 255, 0) if is_flipped else (255, 0, 255))
             self._drawBox(debug_img, right_box, (255, 0, 255) if is_flipped else (255, 255, 0))
 
         return red_score, blue_score
 
-    def _getVaultInfo(self, img, debug_img, is_flipped):
-        # Left powerups
-        left_force_tl = self._transformPoint((75, 83))
-        left_force_br = self._transformPoint((93, 106))
-        left_force_loc = self._transformPoint((40, 84))
-        left_boost_tl = self._transformPoint((145, 83))
-        left_boost_br = self._transformPoint((163, 106))
-        left_boost_loc = self._transformPoint((198, 84))
-        left_levitate_tl = self._transformPoint((110, 65))
-        left_levitate_br = self._transformPoint((127, 86))
-        left_levitate_loc = self._transformPoint((99, 44))
-
-        # Right powerups
-        right_force_tl = self._transformPoint((1279 - 163, 83))
-        right_force_br = self._transformPoint((1279 - 145, 106))
-        right_force_loc = self._transformPoint((1279 - 198, 84))
-        right_boost_tl = self._transformPoint((1279 - 93, 83))
-        right_boost_br = self._transformPoint((1279 - 75, 106))
-        right_boost_loc = self._transformPoint((1279 - 40, 84))
-        right_levitate_tl = self._transformPoint((1279 - 128, 65))
-        right_levitate_br = self._transformPoint((1279 - 110, 86))
-        right_levitate_loc = self._transformPoint((1279 - 99, 44))
-
+    def _getVaultInfo(self, img, debug_img, probes, rois, is_flipped):
         # Counts
-        left_boost_count = self._parseDigits(self._getImgCropThresh(img, left_boost_tl, left_boost_br))
-        left_force_count = self._parseDigits(self._getImgCropThresh(img, left_force_tl, left_force_br))
-        left_levitate_count = self._parseDigits(self._getImgCropThresh(img, left_levitate_tl, left_levitate_br))
-        right_boost_count = self._parseDigits(self._getImgCropThresh(img, right_boost_tl, right_boost_br))
-        right_force_count = self._parseDigits(self._getImgCropThresh(img, right_force_tl, right_force_br))
-        right_levitate_count = self._parseDigits(self._getImgCropThresh(img, right_levitate_tl, right_levitate_br))
+        left_boost_count = self._readDigits(rois, 'left_boost')
+        left_force_count = self._readDigits(rois, 'left_force')
+        left_levitate_count = self._readDigits(rois, 'left_levitate')
+        right_boost_count = self._readDigits(rois, 'right_boost')
+        right_force_count = self._readDigits(rois, 'right_force')
+        right_levitate_count = self._readDigits(rois, 'right_levitate')
 
         # Played
-        left_boost_played = self._checkSaturated(img, left_boost_loc)
-        left_force_played = self._checkSaturated(img, left_force_loc)
-        left_levitate_played = self._checkSaturated(img, left_levitate_loc)
-        right_boost_played = self._checkSaturated(img, right_boost_loc)
-        right_force_played = self._checkSaturated(img, right_force_loc)
-        right_levitate_played = self._checkSaturated(img, right_levitate_loc)
+        left_boost_played, left_force_played, left_levitate_played = probes.isSaturated('left_played', 0.2).tolist()
+        right_boost_played, right_force_played, right_levitate_played = probes.isSaturated('right_played', 0.2).tolist()
 
         if is_flipped:
             red_boost_count = right_boost_count
@@ -193,24 +171,22 @@ class Livescore2018(LivescoreBase):
         if self._debug:
             left_color = (255, 255, 0) if is_flipped else (255, 0, 255)
             right_color = (255, 0, 255) if is_flipped else (255, 255, 0)
-            left_boost_box = self._cornersToBox(left_boost_tl, left_boost_br)
-            left_force_box = self._cornersToBox(left_force_tl, left_force_br)
-            left_levitate_box = self._cornersToBox(left_levitate_tl, left_levitate_br)
-            right_boost_box = self._cornersToBox(right_boost_tl, right_boost_br)
-            right_force_box = self._cornersToBox(right_force_tl, right_force_br)
-            right_levitate_box = self._cornersToBox(right_levitate_tl, right_levitate_br)
+            left_boost_box = self._cornersToBox(*rois.getCorners('left_boost'))
+            left_force_box = self._cornersToBox(*rois.getCorners('left_force'))
+            left_levitate_box = self._cornersToBox(*rois.getCorners('left_levitate'))
+            right_boost_box = self._cornersToBox(*rois.getCorners('right_boost'))
+            right_force_box = self._cornersToBox(*rois.getCorners('right_force'))
+            right_levitate_box = self._cornersToBox(*rois.getCorners('right_levitate'))
             self._drawBox(debug_img, left_boost_box, left_color)
             self._drawBox(debug_img, left_force_box, left_color)
             self._drawBox(debug_img, left_levitate_box, left_color)
             self._drawBox(debug_img, right_boost_box, right_color)
             self._drawBox(debug_img, right_force_box, right_color)
             self._drawBox(debug_img, right_levitate_box, right_color)
-            cv2.circle(debug_img, left_boost_loc, 2, left_color, -1)
-            cv2.circle(debug_img, left_force_loc, 2, left_color, -1)
-            cv2.circle(debug_img, left_levitate_loc, 2, left_color, -1)
-            cv2.circle(debug_img, right_boost_loc, 2, right_color, -1)
-            cv2.circle(debug_img, right_force_loc, 2, right_color, -1)
-            cv2.circle(debug_img, right_levitate_loc, 2, right_color, -1)
+            for point in probes.getPoints('left_played'):
+                cv2.circle(debug_img, point, 2, left_color, -1)
+            for point in probes.getPoints('right_played'):
+                cv2.circle(debug_img, point, 2, right_color, -1)
 
         return (
             red_boost_count, red_boost_played,
@@ -221,16 +197,9 @@ class Livescore2018(LivescoreBase):
             blue_levitate_count, blue_levitate_played,
         )
 
-    def _getSwitchScaleInfo(self, img, debug_img, is_flipped):
-        left_switch_loc = self._transformPoint((257, 76))
-        left_scale_loc = self._transformPoint((257, 51))
-        right_switch_loc = self._transformPoint((1279 - 257,  76))
-        right_scale_loc = self._transformPoint((1279 - 257, 51))
-
-        left_switch_owned = self._checkSaturated(img, left_switch_loc)
-        left_scale_owned = self._checkSaturated(img, left_scale_loc)
-        right_switch_owned = self._checkSaturated(img, right_switch_loc)
-        right_scale_owned = self._checkSaturated(img, right_scale_loc)
+    def _getSwitchScaleInfo(self, img, debug_img, probes, is_flipped):
+        left_switch_owned, left_scale_owned = probes.isSaturated('left_owned', 0.2).tolist()
+        right_switch_owned, right_scale_owned = probes.isSaturated('right_owned', 0.2).tolist()
 
         if is_flipped:
             red_switch_owned = right_switch_owned
@@ -246,47 +215,40 @@ class Livescore2018(LivescoreBase):
         if self._debug:
             left_color = (255, 255, 0) if is_flipped else (255, 0, 255)
             right_color = (255, 0, 255) if is_flipped else (255, 255, 0)
-            cv2.circle(debug_img, left_switch_loc, 2, left_color, -1)
-            cv2.circle(debug_img, left_scale_loc, 2, left_color, -1)
-            cv2.circle(debug_img, right_switch_loc, 2, right_color, -1)
-            cv2.circle(debug_img, right_scale_loc, 2, right_color, -1)
+            for point in probes.getPoints('left_owned'):
+                cv2.circle(debug_img, point, 2, left_color, -1)
+            for point in probes.getPoints('right_owned'):
+                cv2.circle(debug_img, point, 2, right_color, -1)
 
         return (
             red_switch_owned, blue_switch_owned,
             red_scale_owned, blue_scale_owned,
         )
 
-    def _getPowerupInfo(self, img, debug_img):
-        # Who owns powerup
-        left_point = self._transformPoint((631, 107))
-        right_point = self._transformPoint((1279 - 631, 107))
+    def _getPowerupInfo(self, img, debug_img, probes, rois):
         # Which powerup
         powerup_tl = self._transformPoint((630, 80))
         powerup_br = self._transformPoint((1279 - 630, 105))
-        # How much time left
-        time_tl = self._transformPoint((624, 50))
-        time_br = self._transformPoint((1279 - 624, 79))
 
         if self._debug:
-            time_box = self._cornersToBox(time_tl, time_br)
+            time_box = self._cornersToBox(*rois.getCorners('powerup_time'))
             self._drawBox(debug_img, time_box, (0, 255, 0))
-            cv2.circle(debug_img, left_point, 2, (0, 255, 0), -1)
-            cv2.circle(debug_img, right_point, 2, (0, 255, 0), -1)
+            for point in probes.getPoints('powerup_owner'):
+                cv2.circle(debug_img, point, 2, (0, 255, 0), -1)
             powerup_box = self._cornersToBox(powerup_tl, powerup_br)
             self._drawBox(debug_img, powerup_box, (0, 255, 0))
 
         # Who owns powerup
-        left_bgr = img[left_point[1], left_point[0], :]
-        right_bgr = img[right_point[1], right_point[0], :]
+        owner_blue = probes.isBlue('powerup_owner')
+        owner_red = probes.isRed('powerup_owner')
 
-        if not ((left_bgr[0] > left_bgr[2] and right_bgr[0] > right_bgr[2]) or
-                (left_bgr[0] < left_bgr[2] and right_bgr[0] < right_bgr[2])):
+        if not (owner_blue.all() or owner_red.all()):
             return None, None, None, None
 
-        is_red_powerup = left_bgr[0] < left_bgr[2]  # More red than blue
+        is_red_powerup = bool(owner_red[0])
 
         # How much time left
-        time = self._parseDigits(self._getImgCropThresh(img, time_tl, time_br, white=True))
+        time = self._readDigits(rois, 'powerup_time')
 
         # Which powerup
         powerup_img = img[powerup_tl[1]:powerup_br[1], powerup_tl[0]:powerup_br[0]]
@@ -297,26 +259,11 @@ class Livescore2018(LivescoreBase):
         else:
             return (None, current_powerup, None, time)
 
-    def _getAutoBoss(self, img, debug_img, is_flipped):
-        left_auto_loc = self._transformPoint((550, 54))
-        left_boss_loc = self._transformPoint((580, 54))
-        right_auto_loc = self._transformPoint((700, 54))
-        right_boss_loc = self._transformPoint((730, 54))
-
-        left_auto_sample = img[left_auto_loc[1], left_auto_loc[0], :]
-        left_boss_sample = img[left_boss_loc[1], left_boss_loc[0], :]
-        right_auto_sample = img[right_auto_loc[1], right_auto_loc[0], :]
-        right_boss_sample = img[right_boss_loc[1], right_boss_loc[0], :]
-
-        left_auto_hsv = colorsys.rgb_to_hsv(float(left_auto_sample[2])/255, float(left_auto_sample[1])/255, float(left_auto_sample[0])/255)
-        left_boss_hsv = colorsys.rgb_to_hsv(float(left_boss_sample[2])/255, float(left_boss_sample[1])/255, float(left_boss_sample[0])/255)
-        right_auto_hsv = colorsys.rgb_to_hsv(float(right_auto_sample[2])/255, float(right_auto_sample[1])/255, float(right_auto_sample[0])/255)
-        right_boss_hsv = colorsys.rgb_to_hsv(float(right_boss_sample[2])/255, float(right_boss_sample[1])/255, float(right_boss_sample[0])/255)
-
-        left_auto_quest = left_auto_hsv[0] > 0.116 and left_auto_hsv[0] < 0.216
-        left_face_the_boss = left_boss_hsv[0] > 0.116 and left_boss_hsv[0] < 0.216
-        right_auto_quest = right_auto_hsv[0] > 0.116 and right_auto_hsv[0] < 0.216
-        right_face_the_boss = right_boss_hsv[0] > 0.116 and right_boss_hsv[0] < 0.216
+    def _getAutoBoss(self, img, debug_img, probes, is_flipped):
+        left_auto_quest, left_face_the_boss = probes.isHueInRange(
+            'left_auto_boss', self._YELLOW_HUE_LOW, self._YELLOW_HUE_HIGH).tolist()
+        right_auto_quest, right_face_the_boss = probes.isHueInRange(
+            'right_auto_boss', self._YELLOW_HUE_LOW, self._YELLOW_HUE_HIGH).tolist()
 
         if is_flipped:
             red_auto_quest = right_auto_quest
@@ -332,10 +279,10 @@ class Livescore2018(LivescoreBase):
         if self._debug:
             left_color = (255, 255, 0) if is_flipped else (255, 0, 255)
             right_color = (255, 0, 255) if is_flipped else (255, 255, 0)
-            cv2.circle(debug_img, left_auto_loc, 2, left_color, -1)
-            cv2.circle(debug_img, left_boss_loc, 2, left_color, -1)
-            cv2.circle(debug_img, right_auto_loc, 2, right_color, -1)
-            cv2.circle(debug_img, right_boss_loc, 2, right_color, -1)
+            for point in probes.getPoints('left_auto_boss'):
+                cv2.circle(debug_img, point, 2, left_color, -1)
+            for point in probes.getPoints('right_auto_boss'):
+                cv2.circle(debug_img, point, 2, right_color, -1)
 
         return (
             red_auto_quest, blue_auto_quest,
@@ -345,14 +292,16 @@ class Livescore2018(LivescoreBase):
     def _getMatchDetails(self, img, force_find_overlay):
         debug_img = None
         if self._debug:
-            debug_img = img.copy()
+            debug_img = self._getDebugImage(img)
 
-        time_remaining, mode = self._getTimeAndMode(img, debug_img)
+        probes = self._sampleProbes(img)
+        rois = self._getRoisThresh(img)
+        time_remaining, mode = self._getTimeAndMode(img, debug_img, probes, rois)
         if self._is_new_overlay or force_find_overlay:
             self._match_key = None
         match_key, match_name = self._getMatchKeyName(img, debug_img)
-        is_flipped = self._getFlipped(img, debug_img)
-        red_score, blue_score = self._getScores(img, debug_img, is_flipped)
+        is_flipped = self._getFlipped(img, debug_img, probes)
+        red_score, blue_score = self._getScores(img, debug_img, rois, is_flipped)
 
         (
             red_boost_count, red_boost_played,
@@ -361,19 +310,19 @@ class Livescore2018(LivescoreBase):
             blue_boost_count, blue_boost_played,
             blue_force_count, blue_force_played,
             blue_levitate_count, blue_levitate_played,
-        ) = self._getVaultInfo(img, debug_img, is_flipped)
+        ) = self._getVaultInfo(img, debug_img, probes, rois, is_flipped)
         (
             red_switch_owned, blue_switch_owned,
             red_scale_owned, blue_scale_owned,
-        ) = self._getSwitchScaleInfo(img, debug_img, is_flipped)
+        ) = self._getSwitchScaleInfo(img, debug_img, probes, is_flipped)
         (
             red_current_powerup, blue_current_powerup,
             red_powerup_time_remaining, blue_powerup_time_remaining,
-        ) = self._getPowerupInfo(img, debug_img)
+        ) = self._getPowerupInfo(img, debug_img, probes, rois)
         (
             red_auto_quest, blue_auto_quest,
             red_face_the_boss, blue_face_the_boss,
-        ) = self._getAutoBoss(img, debug_img, is_flipped)
+        ) = self._getAutoBoss(img, debug_img, probes, is_flipped)
 
         if self._debug:
             cv2.imshow("ROIs", debug_img)
@@ -0,0 +1,121 @@
+import cv2
+import numpy as np
+import os
+import pkg_resources
+
+from .LivescoreBase import FRAME_FORMATS, NoOverlayFoundException
+from .Livescore2017 import Livescore2017
+from .Livescore2018 import Livescore2018
+from .Livescore2019 import Livescore2019
+from .Livescore2020 import Livescore2020
+from .Livescore2021 import Livescore2021
+from .Livescore2022 import Livescore2022
+from .features import KnnMatcher, create_detector
+from .keypoints import template_keypoints
+
+READERS = {
+    2017: Livescore2017,
+    2018: Livescore2018,
+    2019: Livescore2019,
+    2020: Livescore2020,
+    2021: Livescore2021,
+    2022: Livescore2022,
+}
+
+
+class LivescoreAuto(object):
+    """Reads footage of any supported year. The score overlay templates of every year are indexed in one labelled
+    matcher, so the year and overlay transform come out of a single search, which is then handed off to that year's
+    reader."""
+    def __init__(self, **kwargs):
+        self._reader_kwargs = kwargs  # Passed on to the year readers
+        self._readers = {}
+        self._reader = None
+        self.year = None
+
+        # Same detector as the year readers. The frame descriptors query the template index, so probing fewer
+        # buckets than the readers do keeps the search fast, and fitting a transform per year weeds out the extra
+        # false matches
+        detector = kwargs.get('detector', 'orb')
+        self._detector = create_detector(detector)
+        matcher = KnnMatcher(kwargs.get('matcher', 'flann'), multi_probe_level=0)
+
+        self._MIN_MATCH_COUNT = 9
+
+        # The descriptors of every template are indexed together, each labelled with the index of its year
+        self._years = sorted(READERS)
+        self._template_kps = []
+        descriptors = []
+        for year in self._years:
+            template_file = os.path.join(pkg_resources.resource_filename(__name__, 'templates'),
+                                         'score_overlay_{}.png'.format(year))
+            # Shared with the year readers, which build the same full size template keypoints
+            kp, des = template_keypoints(template_file, 1, detector, kwargs.get('pruned_keypoints'),
+                                         lambda: cv2.imread(template_file))
+            self._template_kps.append(kp)
+            descriptors.append(des)
+        self._template_labels = np.repeat(np.arange(len(self._years)), [len(des) for des in descriptors])
+        self._template_pts = np.vstack([cv2.KeyPoint_convert(kp) for kp in self._template_kps])
+        self._index = matcher.index(np.vstack(descriptors))
+
+    def _lumaFrame(self, img, frame_format):
+        # ORB only looks at luma, so detection runs on the Y plane scaled to 720p, like the year readers do
+        if frame_format not in FRAME_FORMATS:
+            raise ValueError("Unknown frame format {}, expected one of {}".format(frame_format, FRAME_FORMATS))
+        if frame_format == 'bgr':
+            img = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+        elif frame_format in ('nv12', 'i420'):
+            img = img[:img.shape[0] * 2 // 3]
+        if img.shape[:2] != (720, 1280):
+            img = cv2.resize(img, (1280, 720))
+        return img
+
+    def detectYear(self, img, frame_format='bgr'):
+        # Returns the game year of the overlay in the frame and its transform in the frame scaled to 720p
+        img = self._lumaFrame(img, frame_format)
+        kp2, des2 = self._detector.detectAndCompute(img, None)
+        if des2 is None or len(des2) < 2:
+            raise NoOverlayFoundException("No keypoints found")
+        distances, indices = self._index.knnSearch(des2, 2)
+
+        # Lowe's ratio test against the nearest descriptors of all years, labelling the good matches by year
+        good = (indices[:, 1] >= 0) & (distances[:, 0] < 0.75 * distances[:, 1])
+        query_idx = np.flatnonzero(good)
+        train_idx = indices[good, 0]
+        labels = self._template_labels[train_idx]
+        frame_pts = cv2.KeyPoint_convert(kp2)
+        # Every year with enough matches gets a transform fitted, and the one with the most inliers wins, since
+        # shared features such as logos can give the wrong year plenty of matches that don't fit together
+        best = None
+        for idx in np.flatnonzero(np.bincount(labels, minlength=len(self._years)) >= self._MIN_MATCH_COUNT):
+            year_good = labels == idx
+            src_pts = self._template_pts[train_idx[year_good]].reshape(-1, 1, 2)
+            dst_pts = frame_pts[query_idx[year_good]].reshape(-1, 1, 2)
+            t, inliers = cv2.estimateAffinePartial2D(src_pts, dst_pts)
+            if t is None or t[0, 0] <= 0:
+                continue
+            num_inliers = int(inliers.sum())
+            if best is None or num_inliers > best[0]:
+                best = (num_inliers, idx, t)
+
+        if best is None or best[0] < self._MIN_MATCH_COUNT:
+            raise NoOverlayFoundException("Not enough matches are found - {}/{}".format(
+                0 if best is None else best[0], self._MIN_MATCH_COUNT))
+        _, idx, t = best
+        return self._years[idx], {
+            'scale': t[0, 0],
+            'tx': t[0, 2],
+            'ty': t[1, 2],
+        }
+
+    def read(self, img, force_find_overlay=False, frame_format='bgr'):
+        # The year is detected on the first frame with an overlay, and again whenever force_find_overlay is set
+        if self._reader is not None and not force_find_overlay:
+            return self._reader.read(img, frame_format=frame_format)
+
+        year, transform = self.detectYear(img, frame_format)
+        if year not in self._readers:
+            self._readers[year] = READERS[year](**self._reader_kwargs)
+        self._reader = self._readers[year]
+        self.year = year
+        return self._reader._readAt(img, transform, frame_format)
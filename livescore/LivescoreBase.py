@@ -1,16 +1,24 @@
-import colorsys
 import cv2
 import numpy as np
 import os
 import pickle
 import logging
-from PIL import Image
 import pkg_resources
 import pytesseract
 import regex
 
-from .simpleocr_utils.segmentation import segments_to_numpy
 from .simpleocr_utils.feature_extraction import SimpleFeatureExtractor
+from .probes import ProbeSamples, sample_probes, bgr_to_hsv, yuv_to_bgr
+from .rois import RoiStrip, RoiImages
+from .buffers import BufferPool
+from .ocr import read_cells, read_each
+from .digits import ROW_SIZE, DigitClassifier, TrainingJournal, journal_path, load_classifier, segment_digits
+from .features import KnnMatcher, TiledDetector, create_detector
+from .keypoints import template_keypoints
+from .registry import call_at_exit, read_only, shared
+
+# Training data readers classify digits with, and learn digits into with save_training_data
+TRAINING_DATA_FILE = pkg_resources.resource_filename(__name__, 'training_data') + '/digits.pkl'
 
 TESSDATA_DIR = os.path.dirname(os.path.realpath(__file__)).replace('\\', '/') + '/tessdata'
 
@@ -35,6 +43,9 @@ SF_BRACKET_ELIM_MAPPING = {
     4: (2, 2),
 }
 
+# Supported frame layouts for read(): interleaved BGR, single channel gray, and planar YUV 4:2:0 from video decoders
+FRAME_FORMATS = ('bgr', 'gray', 'nv12', 'i420')
+
 NUMBER_PATTERN = '0-9ZSO'  # Characters that might get recognized as numbers
 
 
@@ -88,7 +99,17 @@ class InvalidScaleException(Exception):
 
 
 class LivescoreBase(object):
-    def __init__(self, game_year, debug=False, save_training_data=False, append_training_data=True):
+    # Color probe points in template coordinates, sampled together once per frame
+    _PROBES = {}
+    # Digit ROIs in template coordinates as name -> (tl, br, white), thresholded together once per frame
+    _ROIS = {}
+
+    def __init__(self, game_year, debug=False, save_training_data=False, append_training_data=True, detect_scale=1,
+                 native_resolution=False, prefilter=False, search_backoff=False, calibration=None,
+                 pruned_keypoints=False, detector='orb', matcher='flann', detect_tiles=None,
+                 active_sampling=False, binary_digits=False, reuse_confident=False,
+                 montage_ocr=False):
+        self._game_year = game_year
         self._debug = debug
         self._save_training_data = save_training_data
         self._is_new_overlay = False
@@ -99,95 +120,515 @@ class LivescoreBase(object):
         self._BLACK_LOW = np.array([0, 0, 0])
         self._BLACK_HIGH = np.array([135, 135, 155])
 
+        # Equivalent thresholds on the limited range (16-235) luma plane of YUV frames, and on the full range luma of
+        # gray frames
+        self._WHITE_LUMA_LOW = 144
+        self._BLACK_LUMA_HIGH = 129
+        self._WHITE_GRAY_LOW = 149
+        self._BLACK_GRAY_HIGH = 131
+
         self._morph_kernel = np.ones((3, 3), np.uint8)
 
+        self._YELLOW_HUE_LOW = 0.116
+        self._YELLOW_HUE_HIGH = 0.216
+
+        self._PROBE_RADIUS = 0  # Average probe colors over a (2r+1)x(2r+1) neighbourhood, higher is more noise tolerant
+
         self._OCR_HEIGHT = 64  # Do all OCR at this size
 
         self._transform = None  # scale, tx, ty
+        self._frame_size = None  # Width and height of the frame the transform is in
+        self._roi_strip = None
+        self._roi_strip_transform = None  # Transform the ROI strip was built for
+        self._check_template = None  # Mean subtracted template at the last overlay size, for the quick check
+        self._check_template_shape = None
+        self._chroma = None  # U and V planes of the current frame when it was read from YUV
+        self._full_range_luma = False  # Whether the current frame was read from gray rather than YUV
+
+        # Reused frame, strip and debug images, so steady state reading does no large allocations
+        self._buffers = BufferPool()
+        self._extractor = SimpleFeatureExtractor(feature_size=10, stretch=False)
 
         # Setup feature detector and matcher
-        self._detector = cv2.ORB_create(nfeatures=10000)  # nfeatures=1550000
-
-        # FLANN_INDEX_KDTREE = 0
-        FLANN_INDEX_LSH = 6
-        index_params = dict(
-            algorithm=FLANN_INDEX_LSH,
-            table_number=6,
-            key_size=12,
-            multi_probe_level=1
-        )
-        search_params = dict(checks=50)
-        self._flann = cv2.FlannBasedMatcher(index_params, search_params)
-        # -- OR --
-        # self._flann = cv2.BFMatcher(normType=cv2.NORM_HAMMING)
+        self._DETECTOR = detector
+        self._detector = create_detector(detector)
+        self._matcher = KnnMatcher(matcher)
+        # Full frame searches can detect keypoints in (columns, rows) tiles in parallel
+        self._frame_detector = self._detector if detect_tiles is None else TiledDetector(detector, detect_tiles)
 
         self._MIN_MATCH_COUNT = 9
 
+        # Frames whose thumbnail doesn't correlate with a full width overlay band are rejected before a full search.
+        # Off by default, since overlays narrower than the frame, such as in letterboxed streams, are rejected too
+        self._PREFILTER = prefilter
+        self._PREFILTER_WIDTH = 160
+        self._PREFILTER_THRESHOLD = 0.4
+        self._prefilter_template = None  # Template thumbnail at the last frame thumbnail width
+        self._overlay_stats = {'rejected': 0, 'accepted': 0, 'found': 0, 'skipped': 0}
+
+        # While the overlay is gone, only do a full search every 1, 2, 4, ... frames, quick checking where it was
+        # last seen in between
+        self._SEARCH_BACKOFF = search_backoff
+        self._MAX_SEARCH_INTERVAL = 512  # Frames, about 17 seconds at 30 fps
+        self._last_transform = None
+        self._search_misses = 0
+        self._frames_until_search = 0
+
+        # Overlay location saved from an earlier run, tried with the quick check before any search
+        self._calibration = None
+        if calibration is not None:
+            self.setCalibration(calibration)
+
+        # Every overlay of a split screen frame, each with its own transform and match, for readAll()
+        self._MAX_OVERLAYS = 4
+        self._MIN_OVERLAY_SCALE = 0.1  # Fits smaller than this are degenerate
+        self._OVERLAY_CORRELATION_THRESHOLD = 0.4
+        self._overlays = []
+
+        # Full searches can run on a downscaled frame first, then be refined around the overlay at full resolution
+        self._DETECT_SCALE = detect_scale  # lower is faster
+        self._REFINE_MARGIN = 0.25  # Padding around the coarse overlay location, as a fraction of its height
+        if self._DETECT_SCALE < 1 and detector != 'orb':
+            self._detector_small = create_detector(detector)
+            self._detector_refine = create_detector(detector)
+        elif self._DETECT_SCALE < 1:
+            # Keypoint budget shrinks with the frame area and patches with the frame size, so the shorter template
+            # keeps its keypoints and each descriptor covers the same part of the overlay as at full resolution
+            patch_size = max(2, int(round(31 * self._DETECT_SCALE)))
+            self._detector_small = cv2.ORB_create(nfeatures=max(500, int(10000 * self._DETECT_SCALE ** 2)),
+                                                  edgeThreshold=patch_size, patchSize=patch_size)
+            # The overlay scale is already known when refining, so only a short pyramid is needed
+            self._detector_refine = cv2.ORB_create(nfeatures=2000, nlevels=3)
+
         # Compute score overlay keypoints and descriptors (Source Image should be 1280x170)
         self._TEMPLATE_SHAPE = (1280, 170)
         self._TEMPLATE_SCALE = 1  # lower is faster
-        template = cv2.imread(
-            pkg_resources.resource_filename(__name__, 'templates') + \
-            '/score_overlay_{}.png'.format(game_year))
+        # Read frames at their own size with the closest template, instead of scaling them to 720p
+        self._NATIVE_RESOLUTION = native_resolution
+        # Use the template keypoints that prune_keypoints kept, for templates that have them
+        self._PRUNED_KEYPOINTS = bool(pruned_keypoints)
+        # Templates, their keypoints and the digit classifier are loaded once per process and shared by every reader,
+        # which only keeps the state of its own stream
+        # Resolution -> template path, and resolution relative to 1280 wide -> template
+        self._template_files, self._overlay_templates = shared(('templates', game_year),
+                                                               lambda: self._loadTemplates(game_year))
+        self._template_res = None
+        self._useTemplate(1)
+
+        # Digit classifier, reading the memory mapped model converted from the training data pickle in place, plus the
+        # digits journaled since it was last compacted
+        self._training_data_file = TRAINING_DATA_FILE
+        if not append_training_data:
+            self._digits = DigitClassifier(np.ndarray((0, ROW_SIZE), np.float32))
+        elif save_training_data:
+            # Trained with the digits this reader learns, so it's not shared, and saved with float features
+            self._digits = load_classifier(self._training_data_file)
+        else:
+            self._digits = shared(('digits', self._training_data_file, binary_digits),
+                                  lambda: load_classifier(self._training_data_file, binary_digits))
+
+        # Learned digits are appended to the journal in batches, until compact_training_data merges them
+        self._journal = None
+        if save_training_data:
+            self._journal = TrainingJournal(journal_path(self._training_data_file), reset=not append_training_data)
+        # Only learn digits the classifier is unsure of or gets wrong
+        self._ACTIVE_SAMPLING = active_sampling
+        # Digit crops are read with one Tesseract call each, or with montage_ocr many at a time tiled into one image,
+        # which is faster but not yet checked to read every crop as its own call does. Digits to learn are then
+        # labelled in batches
+        self._read_crops = read_cells if montage_ocr else read_each
+        self._LABEL_BATCH_SIZE = 64 if montage_ocr else 1
+        self._pending_digits = []  # Features and crop of each
+        if save_training_data:
+            # Registered after the journal, so that it runs first and its digits are journaled
+            call_at_exit(self._learnDigits)
+
+        # Confidence of each ROI and probe read from the current frame, from 0 to 1
+        self._confidence = {}
+        self._probes = None
+        self._TESSERACT_CONFIDENCE = 0.5  # Tesseract fallbacks don't report one
+        # ROIs read confidently are reused on later frames until their thresholded pixels change
+        self._REUSE_CONFIDENT = reuse_confident
+        self._CONFIDENT = 0.9
+        self._REUSE_MAX_CHANGE = 0.01  # Fraction of an ROI's pixels, well under what a digit changing flips
+        self._roi_reads = {}  # ROI name -> binary image, value and confidence of its last read
+
+    def _loadTemplates(self, game_year):
+        # Loads score_overlay_YEAR.png and any higher resolution variants such as score_overlay_YEAR-hires.png
+        # Returns the template files and templates by resolution
+        templates_dir = pkg_resources.resource_filename(__name__, 'templates')
+        template_files = {}
+        templates = {}
+        for filename in sorted(os.listdir(templates_dir)):
+            name, ext = os.path.splitext(filename)
+            if ext == '.png' and name.split('-')[0] == 'score_overlay_{}'.format(game_year):
+                template = cv2.imread(os.path.join(templates_dir, filename))
+                read_only(template)
+                res = float(template.shape[1]) / self._TEMPLATE_SHAPE[0]
+                templates[res] = template
+                template_files[res] = os.path.join(templates_dir, filename)
+        return template_files, templates
+
+    def _useTemplate(self, res):
+        # Switches overlay detection to the template at the given resolution
+        if res == self._template_res:
+            return
+        template_file = self._template_files[res]
+        self._template, self._template_gray = shared(('template', template_file, self._TEMPLATE_SCALE),
+                                                     lambda: self._scaleTemplate(self._overlay_templates[res]))
+        # Template pixels per template coordinate, which is what the transform scale is relative to
+        self._template_scale = self._TEMPLATE_SCALE * res
+
+        # Keypoints depend on the detector, so readers with different detectors each get their own
+        self._kp1, self._des1 = template_keypoints(template_file, self._TEMPLATE_SCALE, self._DETECTOR,
+                                                   self._PRUNED_KEYPOINTS, lambda: self._template)
+        if self._DETECT_SCALE < 1:
+            self._template_small, self._kp1_small, self._des1_small = shared(
+                ('template_keypoints_small', template_file, self._TEMPLATE_SCALE, self._DETECTOR, self._DETECT_SCALE),
+                self._smallTemplateKeypoints)
+
+        # The last transform was relative to the previous template
+        self._template_res = res
+        self._transform = None
+        self._last_transform = None
+        self._overlays = []
+        self._roi_strip_transform = None
+        self._check_template = None
+        self._prefilter_template = None
+
+    def _scaleTemplate(self, template):
+        # Returns the template at the template scale, in color and gray
         tpl_width = np.int32(np.round(template.shape[1] * self._TEMPLATE_SCALE))
         tpl_height = np.int32(np.round(template.shape[0] * self._TEMPLATE_SCALE))
-        self._template = cv2.resize(template, (
+        template = cv2.resize(template, (
             tpl_width,
             tpl_height
         ))
-        self._kp1, self._des1 = self._detector.detectAndCompute(self._template, None)
+        template_gray = cv2.cvtColor(template, cv2.COLOR_BGR2GRAY)
+        read_only(template, template_gray)
+        return template, template_gray
+
+    def _smallTemplateKeypoints(self):
+        # Returns the current template scaled for searching downscaled frames, and its keypoints and descriptors
+        template_small = cv2.resize(self._template, None, fx=self._DETECT_SCALE, fy=self._DETECT_SCALE,
+                                    interpolation=cv2.INTER_AREA)
+        kp, des = self._detector_small.detectAndCompute(template_small, None)
+        read_only(template_small, des)
+        return template_small, kp, des
+
+    def _isOverlayPlausible(self, img):
+        # Cheaply checks whether the frame could contain the overlay as a band across its full width, by sliding a
+        # thumbnail of the template down a thumbnail of the frame
+        width = self._PREFILTER_WIDTH
+        thumb = img
+        step = 0
+        # Halving with INTER_LINEAR averages 2x2 blocks, which matches INTER_AREA at a fraction of the cost
+        while thumb.shape[1] >= 2 * width:
+            size = (thumb.shape[1] // 2, thumb.shape[0] // 2)
+            dst = self._buffers.get('prefilter{}'.format(step), size[::-1] + img.shape[2:])
+            thumb = cv2.resize(thumb, size, dst=dst, interpolation=cv2.INTER_LINEAR)
+            step += 1
+        height = int(round(float(img.shape[0]) * width / img.shape[1]))
+        if thumb.shape[1] != width:
+            thumb = cv2.resize(thumb, (width, height), interpolation=cv2.INTER_AREA)
+
+        if self._prefilter_template is None or self._prefilter_template.ndim != thumb.ndim:
+            template = self._template if thumb.ndim == 3 else self._template_gray
+            tpl_height = int(round(float(template.shape[0]) * width / template.shape[1]))
+            self._prefilter_template = cv2.resize(template, (width, tpl_height), interpolation=cv2.INTER_AREA)
+        if self._prefilter_template.shape[0] > thumb.shape[0]:
+            return True
+
+        res = cv2.matchTemplate(thumb, self._prefilter_template, cv2.TM_CCOEFF_NORMED)
+        _, max_val, _, _ = cv2.minMaxLoc(res)
+        return max_val > self._PREFILTER_THRESHOLD
+
+    def getOverlayStats(self):
+        # Number of frames the prefilter rejected and accepted, how many of those accepted had an overlay, and how
+        # many frames skipped the search while backing off
+        return dict(self._overlay_stats)
+
+    def _isOverlayAt(self, img, transform):
+        # Quick check of whether the overlay is still where the transform puts it
+        y = transform['ty']
+        x = transform['tx']
+        scale = transform['scale']
+        overlay = img[
+                  max(0, int(y)):min(int(y + self._template.shape[0] * scale), img.shape[0] - 1),
+                  max(0, int(x)):min(int(x + self._template.shape[1] * scale), img.shape[1] - 1),
+                  ]
+        if overlay.shape[0] == 0 or overlay.shape[1] == 0:
+            return False
+        if self._check_template is None or self._check_template_shape != overlay.shape:
+            template = self._template if overlay.ndim == 3 else self._template_gray
+            template = cv2.resize(template, (int(overlay.shape[1]), int(overlay.shape[0]))).astype(np.float32)
+            channels = overlay.shape[2] if overlay.ndim == 3 else 1
+            # TM_CCOEFF of two same sized images is their dot product once the template's mean is subtracted, which
+            # is several times cheaper than matchTemplate
+            self._check_template = (template - template.reshape(-1, channels).mean(axis=0)).reshape(-1)
+            self._check_template_shape = overlay.shape
+        overlay_f = self._buffers.get('check', overlay.shape, np.float32)
+        np.copyto(overlay_f, overlay, casting='unsafe')
+        score = np.dot(overlay_f.reshape(-1), self._check_template)
+        # Correlation is summed over channels, so a single luma channel scores about a third as high
+        threshold = 1000000000 if overlay.ndim == 3 else 1000000000 / 3
+        return score > threshold
+
+    def _overlayMissed(self):
+        # Forgets the transform after a failed search and, when backing off, schedules the next search
+        self._transform = None
+        self._is_new_overlay = False
+        if self._SEARCH_BACKOFF:
+            self._search_misses += 1
+            self._frames_until_search = min(2 ** self._search_misses, self._MAX_SEARCH_INTERVAL) - 1
 
-        # For saving training data
-        self._training_data = {
-            'features': np.ndarray((0, 100)),
-            'classes': np.ndarray((0, 1)),
+    def getCalibration(self):
+        # Returns the current overlay location as a calibration profile, or None if the overlay hasn't been found
+        if self._transform is None:
+            return None
+        return {
+            'game_year': self._game_year,
+            'frame_size': list(self._frame_size),
+            # Relative to the 1280 wide template, whichever template found it
+            'transform': {
+                'scale': float(self._transform['scale'] * self._template_scale),
+                'tx': float(self._transform['tx']),
+                'ty': float(self._transform['ty']),
+            },
         }
 
-        # Train classifier
-        self._training_data_file = pkg_resources.resource_filename(__name__, 'training_data') + '/digits.pkl'
-        if append_training_data:
-            with open(self._training_data_file, "rb") as f:
-                self._training_data = pickle.load(f, encoding='latin1')
+    def setCalibration(self, calibration):
+        # Sets a calibration profile from getCalibration(), or one giving the overlay rectangle as
+        # 'overlay': [x, y, width, height] instead of a transform, both in a frame of 'frame_size'
+        if calibration.get('game_year', self._game_year) != self._game_year:
+            raise ValueError("Calibration is for {}, not {}".format(calibration['game_year'], self._game_year))
+        if 'transform' not in calibration and 'overlay' not in calibration:
+            raise ValueError("Calibration needs either a transform or an overlay rectangle")
+        self._calibration = calibration
+
+    def _mapTransform(self, img, transform, frame_size):
+        # Maps a transform of the 1280 wide template in a frame of the given size onto the current frame and template
+        fx = float(img.shape[1]) / frame_size[0]
+        fy = float(img.shape[0]) / frame_size[1]
+        return {
+            'scale': transform['scale'] * fx / self._template_scale,
+            'tx': transform['tx'] * fx,
+            'ty': transform['ty'] * fy,
+        }
 
-        self._knn = cv2.ml.KNearest_create()
-        self._knn.train(self._training_data['features'].astype(np.float32), cv2.ml.ROW_SAMPLE,
-                        self._training_data['classes'].astype(np.float32))
+    def _calibratedTransform(self, img):
+        # Maps the calibration onto the current frame and template
+        if 'transform' in self._calibration:
+            transform = self._calibration['transform']
+        else:
+            tx, ty, width, _ = self._calibration['overlay']
+            transform = {'scale': float(width) / self._TEMPLATE_SHAPE[0], 'tx': tx, 'ty': ty}
+        return self._mapTransform(img, transform, self._calibration['frame_size'])
 
     def _findScoreOverlay(self, img, force_find_overlay):
         # Does a quick check to see if overlay moved
         # If it has, finds and sets the 2d transform of the overlay in the image
         # Sets the transform to None if the overlay is not found
+        self._frame_size = (img.shape[1], img.shape[0])
+
+        if self._transform is None and self._calibration is not None and not force_find_overlay:
+            transform = self._calibratedTransform(img)
+            if self._isOverlayAt(img, transform):
+                # The calibrated location checks out, so there's no need to search
+                self._transform = transform
+                self._calibration = None
+                self._is_new_overlay = True
+                return
 
         if self._transform is not None and not force_find_overlay:
-            y = self._transform['ty']
-            x = self._transform['tx']
-            scale = self._transform['scale']
-            overlay = img[
-                      max(0, int(y)):min(int(y + self._template.shape[0] * scale), img.shape[0] - 1),
-                      max(0, int(x)):min(int(x + self._template.shape[1] * scale), img.shape[1] - 1),
-                      ]
-            if overlay.shape[0] != 0 and overlay.shape[1] != 0:
-                template_img = cv2.resize(self._template, (int(overlay.shape[1]), int(overlay.shape[0])))
-                res = cv2.matchTemplate(overlay, template_img, cv2.TM_CCOEFF)
-                min_val, _, _, _ = cv2.minMaxLoc(res)
-                if min_val > 1000000000:
-                    self._is_new_overlay = False
-                    return
-
-        kp2, des2 = self._detector.detectAndCompute(img, None)
-        matches = self._flann.knnMatch(self._des1, des2, k=2)
-
-        # Store all the good matches as per Lowe's ratio test
-        good = []
-        for match in matches:
-            # skip any matches that don't have two tuples
-            if not (type(match) is tuple and len(match) == 2):
+            if self._isOverlayAt(img, self._transform):
+                self._is_new_overlay = False
+                return
+            self._last_transform = self._transform
+
+        if self._SEARCH_BACKOFF and not force_find_overlay:
+            if self._transform is None and self._last_transform is not None and \
+                    self._isOverlayAt(img, self._last_transform):
+                # The overlay came back where it was last seen
+                self._transform = self._last_transform
+                self._search_misses = 0
+                self._frames_until_search = 0
+                self._is_new_overlay = True
+                return
+            if self._frames_until_search > 0:
+                self._frames_until_search -= 1
+                self._overlay_stats['skipped'] += 1
+                raise NoOverlayFoundException("Backing off the overlay search for {} more frames".format(
+                    self._frames_until_search))
+
+        prefiltered = self._PREFILTER and not force_find_overlay
+        if prefiltered:
+            if not self._isOverlayPlausible(img):
+                self._overlay_stats['rejected'] += 1
+                self._overlayMissed()
+                raise NoOverlayFoundException("Frame rejected by the overlay prefilter")
+            self._overlay_stats['accepted'] += 1
+
+        t = None
+        num_good = 0
+        if self._DETECT_SCALE < 1:
+            t, num_good = self._findScoreOverlayDownscaled(img)
+        if t is None:
+            t, num_good = self._matchOverlay(img, self._frame_detector, self._template, self._kp1, self._des1)
+
+        if t is not None:
+            self._transform = {
+                'scale': t[0, 0],
+                'tx': t[0, 2],
+                'ty': t[1, 2],
+            }
+            if self._transform['scale'] == 0:
+                raise InvalidScaleException("Scale is zero")
+            if prefiltered:
+                self._overlay_stats['found'] += 1
+            self._calibration = None
+            self._search_misses = 0
+            self._frames_until_search = 0
+            self._is_new_overlay = True
+            return
+
+        self._overlayMissed()
+        raise NoOverlayFoundException("Not enough matches are found - {}/{}".format(num_good, self._MIN_MATCH_COUNT))
+
+    def _overlayCorrelation(self, img, transform):
+        # Normalized correlation of the overlay with the template, which unlike the quick check doesn't depend on the
+        # overlay size, or 0 if the overlay is outside of the frame
+        x0 = max(0, int(round(transform['tx'])))
+        y0 = max(0, int(round(transform['ty'])))
+        x1 = min(int(round(transform['tx'] + self._template.shape[1] * transform['scale'])), img.shape[1])
+        y1 = min(int(round(transform['ty'] + self._template.shape[0] * transform['scale'])), img.shape[0])
+        if x1 - x0 < 2 or y1 - y0 < 2:
+            return 0
+        overlay = img[y0:y1, x0:x1]
+        template = self._template if overlay.ndim == 3 else self._template_gray
+        template = cv2.resize(template, (x1 - x0, y1 - y0), interpolation=cv2.INTER_AREA)
+        return cv2.matchTemplate(overlay, template, cv2.TM_CCOEFF_NORMED)[0, 0]
+
+    def _splitScreenKeypoints(self):
+        # Template keypoints plus those of the template at half size, in full size template coordinates, computed on
+        # first use. A half size template is too short for ORB to find keypoints near its edges, so it's padded first
+        def build():
+            pad = 32
+            half = cv2.resize(self._template, None, fx=0.5, fy=0.5, interpolation=cv2.INTER_AREA)
+            half = cv2.copyMakeBorder(half, pad, pad, pad, pad, cv2.BORDER_REPLICATE)
+            kp, des = self._detector.detectAndCompute(half, None)
+            keep = [i for i, k in enumerate(kp) if pad <= k.pt[0] < half.shape[1] - pad and
+                    pad <= k.pt[1] < half.shape[0] - pad]
+            kp1_split = list(self._kp1) + [
+                cv2.KeyPoint((kp[i].pt[0] - pad) * 2, (kp[i].pt[1] - pad) * 2, kp[i].size * 2) for i in keep]
+            des1_split = np.vstack([self._des1, des[keep]]) if keep else self._des1
+            read_only(des1_split)
+            return kp1_split, des1_split
+
+        return shared(('split_keypoints', self._template_files[self._template_res], self._TEMPLATE_SCALE,
+                       self._DETECTOR, self._PRUNED_KEYPOINTS), build)
+
+    def _findScoreOverlays(self, img):
+        # Finds every overlay in the frame from one detection pass, by fitting a transform to the largest consistent
+        # cluster of matches and removing its inliers before fitting the next
+        # Returns the list of transforms found
+        kp1, des1 = self._splitScreenKeypoints()
+        kp2, des2 = self._frame_detector.detectAndCompute(img, None)
+        if des2 is None or len(des2) < 2:
+            return []
+        k = self._MAX_OVERLAYS + 1
+        distances, indices = self._matcher.knnSearch(des1, des2, k)
+
+        # Each overlay matches a template keypoint about equally well, so rather than the best against the second best
+        # match, every match is ratio tested against the furthest one. Missing neighbours are always the furthest
+        found = indices >= 0
+        last = found.sum(axis=1) - 1
+        furthest = distances[np.arange(len(distances)), np.maximum(last, 0)]
+        good = found & (np.arange(k) < last[:, None]) & (distances < 0.75 * furthest[:, None])
+        query_idx, neighbour = np.nonzero(good)
+        src_pts = cv2.KeyPoint_convert(kp1)[query_idx].reshape(-1, 1, 2)
+        dst_pts = cv2.KeyPoint_convert(kp2)[indices[query_idx, neighbour]].reshape(-1, 1, 2)
+
+        transforms = []
+        rects = []
+        height, width = self._template.shape[:2]
+        margin = 0.02 * img.shape[1]
+        while len(src_pts) >= self._MIN_MATCH_COUNT and len(transforms) < self._MAX_OVERLAYS:
+            # Scaled down overlays have fewer inliers, which stray matches within the default 3px can skew
+            t, inliers = cv2.estimateAffinePartial2D(src_pts, dst_pts, ransacReprojThreshold=1.5)
+            if t is None:
+                break
+            inliers = inliers.ravel().astype(bool)
+            if inliers.sum() < self._MIN_MATCH_COUNT:
+                break
+            src_pts = src_pts[~inliers]
+            dst_pts = dst_pts[~inliers]
+
+            # Overlays are upright and inside the frame, so skip degenerate, rotated and off frame fits
+            scale = t[0, 0]
+            if scale < self._MIN_OVERLAY_SCALE or abs(t[1, 0]) > 0.05 * scale:
+                continue
+            x0, y0 = t[0, 2], t[1, 2]
+            x1, y1 = x0 + width * scale, y0 + height * scale
+            if x0 < -margin or y0 < -margin or x1 > img.shape[1] + margin or y1 > img.shape[0] + margin:
                 continue
-            if m.distance < 0.75 * n.distance:
-                good.append(m)
+            # Leftover matches of an overlay already found fit onto it again
+            area = (x1 - x0) * (y1 - y0)
+            if any(max(0, min(x1, r[2]) - max(x0, r[0])) * max(0, min(y1, r[3]) - max(y0, r[1])) >
+                   0.1 * min(area, (r[2] - r[0]) * (r[3] - r[1])) for r in rects):
+                continue
+            transform = {'scale': scale, 'tx': x0, 'ty': y0}
+            # Chance clusters of a few matches don't look like the overlay
+            if self._overlayCorrelation(img, transform) < self._OVERLAY_CORRELATION_THRESHOLD:
+                continue
+            transforms.append(transform)
+            rects.append((x0, y0, x1, y1))
+        return transforms
+
+    def _findScoreOverlayDownscaled(self, img):
+        # Finds the overlay in a downscaled frame, then refines it in a window around that location at full resolution
+        # Returns the transform and number of good matches, or None for the transform if the overlay isn't found
+        s = self._DETECT_SCALE
+        small = cv2.resize(img, None, fx=s, fy=s, interpolation=cv2.INTER_AREA)
+        t, num_good = self._matchOverlay(small, self._detector_small, self._template_small, self._kp1_small,
+                                         self._des1_small)
+        if t is None or t[0, 0] <= 0:
+            return None, num_good
+
+        # Frame and template were scaled alike, so only the translation differs at full resolution
+        t[:, 2] /= s
+
+        corners = np.array([[0, 0, 1], [self._template.shape[1], self._template.shape[0], 1]]).dot(t.T)
+        margin = self._REFINE_MARGIN * (corners[1, 1] - corners[0, 1])
+        x0, y0 = np.int32(np.maximum(corners.min(axis=0) - margin, 0))
+        x1, y1 = np.int32(np.minimum(corners.max(axis=0) + margin, (img.shape[1], img.shape[0])))
+        if x1 <= x0 or y1 <= y0:
+            return None, num_good
+        fine, num_fine = self._matchOverlay(img[y0:y1, x0:x1], self._detector_refine, self._template, self._kp1,
+                                            self._des1)
+        # A coarse fit that doesn't hold up at full resolution falls back to a full search
+        if fine is None or abs(fine[0, 0] / t[0, 0] - 1) > 0.1:
+            return None, num_fine
+        fine[:, 2] += (x0, y0)
+        return fine, num_fine
+
+    def _matchOverlay(self, img, detector, template, kp1, des1):
+        # Matches the template keypoints against the image and fits the template to image transform
+        # Returns the 2x3 transform and number of good matches, or None for the transform if there are too few
+        kp2, des2 = detector.detectAndCompute(img, None)
+        if des2 is None or len(des2) < 2:
+            return None, 0
+        distances, indices = self._matcher.knnSearch(des1, des2, 2)
+
+        # Good matches as per Lowe's ratio test, skipping any without a second neighbour
+        good = (indices[:, 1] >= 0) & (distances[:, 0] < 0.75 * distances[:, 1])
+        query_idx = np.flatnonzero(good)
+        train_idx = indices[good, 0]
 
         if self._debug:
-            debug_img = cv2.drawMatchesKnn(self._template, self._kp1, img, kp2, [[m] for m in good], None,
+            good_matches = zip(query_idx, train_idx, distances[good, 0])
+            matches = [[cv2.DMatch(int(q), int(t), float(d))] for q, t, d in good_matches]
+            debug_img = cv2.drawMatchesKnn(template, kp1, img, kp2, matches, None,
                                            flags=cv2.DrawMatchesFlags_DEFAULT)
             debug_img = cv2.resize(debug_img, (
                 np.int32(1280 * 2 / 2),
@@ -196,34 +637,52 @@ class LivescoreBase(object):
             cv2.imshow("Match", debug_img)
             cv2.waitKey()
 
-        if len(good) >= self._MIN_MATCH_COUNT:
-            src_pts = np.float32([self._kp1[m.queryIdx].pt for m in good]).reshape(-1, 1, 2)
-            dst_pts = np.float32([kp2[m.trainIdx].pt for m in good]).reshape(-1, 1, 2)
+        if len(query_idx) >= self._MIN_MATCH_COUNT:
+            src_pts = cv2.KeyPoint_convert(kp1)[query_idx].reshape(-1, 1, 2)
+            dst_pts = cv2.KeyPoint_convert(kp2)[train_idx].reshape(-1, 1, 2)
 
-            t = cv2.estimateAffinePartial2D(src_pts, dst_pts)
+            t, _ = cv2.estimateAffinePartial2D(src_pts, dst_pts)
             if t is not None:
-                self._transform = {
-                    'scale': t[0][0, 0],
-                    'tx': t[0][0, 2],
-                    'ty': t[0][1, 2],
-                }
-                if self._transform['scale'] == 0:
-                    raise InvalidScaleException("Scale is zero")
-                self._is_new_overlay = True
-                return
+                return t, len(query_idx)
 
-        self._transform = None
-        self._is_new_overlay = False
-
-        raise NoOverlayFoundException("Not enough matches are found - {}/{}".format(len(good), self._MIN_MATCH_COUNT))
+        return None, len(query_idx)
 
     def _transformPoint(self, point):
         # Transforms a point from template coordinates to image coordinates
-        scale = self._transform['scale'] * self._TEMPLATE_SCALE
+        scale = self._transform['scale'] * self._template_scale
         tx = self._transform['tx']
         ty = self._transform['ty']
         return np.int32(np.round(point[0] * scale + tx)), np.int32(np.round(point[1] * scale + ty))
 
+    def _transformPoints(self, points):
+        # Transforms an array of points from template coordinates to image coordinates
+        scale = self._transform['scale'] * self._template_scale
+        offset = np.array([self._transform['tx'], self._transform['ty']])
+        return np.int32(np.round(np.asarray(points, dtype=np.float64) * scale + offset))
+
+    def _sampleProbes(self, img):
+        # Samples all of the probe points of a frame and converts them to HSV in one pass
+        index = {}
+        points = []
+        for name, locs in self._PROBES.items():
+            index[name] = slice(len(points), len(points) + len(locs))
+            points.extend(locs)
+        points = self._transformPoints(points)
+        if img.ndim == 3:
+            bgr = sample_probes(img, points, self._PROBE_RADIUS)
+        elif self._chroma is not None:
+            # Only the probe points are converted from YUV, with chroma sampled from the planes at their own size
+            u, v = self._chroma
+            chroma_points = points * (float(u.shape[1]) / img.shape[1], float(u.shape[0]) / img.shape[0])
+            bgr = yuv_to_bgr(sample_probes(img, points, self._PROBE_RADIUS),
+                             sample_probes(u, chroma_points, self._PROBE_RADIUS),
+                             sample_probes(v, chroma_points, self._PROBE_RADIUS))
+        else:
+            # Gray frames have no color, so every probe reads as unsaturated
+            bgr = np.repeat(sample_probes(img, points, self._PROBE_RADIUS), 3, axis=1)
+        self._probes = ProbeSamples(index, points, bgr, bgr_to_hsv(bgr))
+        return self._probes
+
     def _cornersToBox(self, tl, br):
         return np.array([
             [tl[0], tl[1]],
@@ -232,6 +691,14 @@ class LivescoreBase(object):
             [tl[0], br[1]]
         ])
 
+    def _getThreshRange(self, img, white):
+        # Returns the inRange bounds for white or black text, on all three channels or on luma only
+        if img.ndim == 3:
+            return (self._WHITE_LOW, self._WHITE_HIGH) if white else (self._BLACK_LOW, self._BLACK_HIGH)
+        if self._full_range_luma:
+            return (self._WHITE_GRAY_LOW, 255) if white else (0, self._BLACK_GRAY_HIGH)
+        return (self._WHITE_LUMA_LOW, 255) if white else (0, self._BLACK_LUMA_HIGH)
+
     def _getImgCropThresh(self, img, tl, br, white=False):
         # Crop
         img = img[tl[1]:br[1], tl[0]:br[0]]
@@ -242,92 +709,132 @@ class LivescoreBase(object):
         img = cv2.resize(img, (int(img.shape[1] * scale), int(img.shape[0] * scale)))
 
         # Threshold
-        if white:
-            return cv2.morphologyEx(cv2.inRange(img, self._WHITE_LOW, self._WHITE_HIGH), cv2.MORPH_OPEN,
-                                    self._morph_kernel)
-        else:
-            return cv2.morphologyEx(cv2.inRange(img, self._BLACK_LOW, self._BLACK_HIGH), cv2.MORPH_OPEN,
-                                    self._morph_kernel)
+        low, high = self._getThreshRange(img, white)
+        return cv2.morphologyEx(cv2.inRange(img, low, high), cv2.MORPH_OPEN, self._morph_kernel)
+
+    def _getRoisThresh(self, img):
+        # Crops, scales and thresholds every ROI of the frame in one pass over a packed strip
+        transform = (self._transform['scale'], self._transform['tx'], self._transform['ty'])
+        if self._roi_strip_transform != transform:
+            rects = {}
+            for white in (True, False):  # White ROIs first
+                for name, (tl, br, is_white) in self._ROIS.items():
+                    if is_white == white:
+                        rects[name] = (self._transformPoint(tl), self._transformPoint(br), white)
+            self._roi_strip = RoiStrip(rects, self._OCR_HEIGHT, self._morph_kernel.shape)
+            self._roi_strip_transform = transform
+        strip = self._roi_strip
+
+        img = cv2.remap(img, strip.map1, strip.map2, cv2.INTER_LINEAR,
+                        dst=self._buffers.get('roi_strip', strip.map1.shape[:2] + img.shape[2:], img.dtype))
+        binary = self._buffers.get('roi_binary', img.shape[:2])
+        split = strip.white_end
+        cv2.inRange(img[:, :split], *self._getThreshRange(img, True), dst=binary[:, :split])
+        cv2.inRange(img[:, split:], *self._getThreshRange(img, False), dst=binary[:, split:])
+
+        # Open, making the gaps neutral for each step so that no ROI affects its neighbours
+        binary[strip.gap] = 255
+        cv2.erode(binary, self._morph_kernel, dst=binary)
+        binary[strip.gap] = 0
+        cv2.dilate(binary, self._morph_kernel, dst=binary)
+        return RoiImages(strip, binary)
 
     def _parseRawMatchName(self, img):
         config = '--oem 1 --psm 7 {} -l eng'.format(TESSDATA_CONFIG)
         return pytesseract.image_to_string(255 - img, config=config).strip()
 
-    def _parseDigits(self, img):
-        # Crop height to digits
-        contours, _ = cv2.findContours(img, cv2.RETR_LIST, cv2.CHAIN_APPROX_SIMPLE)
-        top = img.shape[1]
-        bottom = 0
-        for cnt in contours:
-            if cv2.contourArea(cnt) > 50:
-                x, y, w, h = cv2.boundingRect(cnt)
-                top = min(top, y)
-                bottom = max(bottom, y + h)
-        height = bottom - top
-        if height <= 0:
-            return None
-        img = img[top:bottom, :]
-        # Scale to uniform height
-        scale = float(self._OCR_HEIGHT) / height
-        img = cv2.resize(img, (int(img.shape[1] * scale), int(img.shape[0] * scale)))
+    def _segmentDigits(self, img):
+        # Returns each digit of a thresholded ROI, left to right, as its features, left edge and crop at OCR height
+        features, boxes, img = segment_digits(img, self._OCR_HEIGHT, self._extractor)
+        return [(features[i:i + 1], x, img[y:y + h, x:x + w]) for i, (x, y, w, h) in enumerate(boxes)]
+
+    def _labelDigits(self, crops):
+        # Reads digit crops with Tesseract, returning the class of each or None
+        digit_imgs = []
+        for crop in crops:
+            # Construct clean digit image
+            h, w = crop.shape
+            dim = self._OCR_HEIGHT + 5
+            digit_img = np.ones((dim, dim), np.uint8) * 255
+            x2 = int(dim / 2 - w / 2)
+            y2 = int(dim / 2 - h / 2)
+            digit_img[y2:y2 + h, x2:x2 + w] = 255 - crop
+            digit_imgs.append(digit_img)
+
+        config = '--oem 1 {} -l digits'.format(TESSDATA_CONFIG)
+        return [int(string) if string and string.isdigit() else None for string in self._read_crops(digit_imgs, config)]
+
+    def _learnDigits(self):
+        # Labels the digits queued while reading frames and learns them
+        if not self._pending_digits:
+            return
+        labels = self._labelDigits([crop for _, crop in self._pending_digits])
+        for (features, _), digit_class in zip(self._pending_digits, labels):
+            if digit_class is not None and (not self._ACTIVE_SAMPLING or
+                                            self._digits.isUncertain(features, digit_class)):
+                self._digits.train(np.hstack([[[digit_class]], features]))
+                self._journal.append(digit_class, features)
+        self._pending_digits = []
+
+    def _readDigits(self, rois, name):
+        # Parses the digits of an ROI, recording the confidence of the read. With reuse_confident, a confident read is
+        # reused while the ROI's pixels stay the same
+        img = rois.getImage(name)
+        last = self._roi_reads.get(name)
+        if last is not None and last[0].shape == img.shape and \
+                cv2.countNonZero(cv2.absdiff(last[0], img)) <= self._REUSE_MAX_CHANGE * img.size:
+            value, confidence = last[1:]
+        else:
+            value, confidence = self._parseDigits(img)
+            if self._REUSE_CONFIDENT and not self._save_training_data and confidence >= self._CONFIDENT:
+                self._roi_reads[name] = (img.copy(), value, confidence)
+            else:
+                self._roi_reads.pop(name, None)
+        self._confidence[name] = confidence
+        return value
 
-        # Find bounds for each digit
-        contours, _ = cv2.findContours(img, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    def _parseDigits(self, img):
+        # Returns the number in a thresholded ROI, or None, and the confidence of its least confident digit
         digits = []
-        for cnt in filter(lambda c: cv2.contourArea(c) > 100, contours):
-            segments = segments_to_numpy([cv2.boundingRect(cnt)])
-            extractor = SimpleFeatureExtractor(feature_size=10, stretch=False)
-            features = extractor.extract(img, segments)
-            x, y, w, h = cv2.boundingRect(cnt)
-
+        fallbacks = []  # Crops of more than 1 digit and their left edges, read with Tesseract after the rest
+        confidence = 1.0
+        for features, x, crop in self._segmentDigits(img):
+            w = crop.shape[1]
             if self._save_training_data:
-                # Construct clean digit image
                 if w > self._OCR_HEIGHT:  # Junk, or more than 1 digit
                     continue
 
-                dim = self._OCR_HEIGHT + 5
-                digit_img = np.ones((dim, dim), np.uint8) * 255
-                x2 = int(dim / 2 - w / 2)
-                y2 = int(dim / 2 - h / 2)
-                digit_img[y2:y2 + h, x2:x2 + w] = 255 - img[y:y + h, x:x + w]
-
-                config = '--oem 1 --psm 8 {} -l digits'.format(TESSDATA_CONFIG)
-                string = pytesseract.image_to_string(
-                    Image.fromarray(digit_img),
-                    config=config).strip()
-                if string and string.isdigit():
-                    self._training_data['features'] = np.append(self._training_data['features'], features, axis=0)
-                    self._training_data['classes'] = np.append(self._training_data['classes'], [[int(string)]], axis=0)
-
-                    # Update saved training data
-                    with open(self._training_data_file, "wb") as f:
-                        pickle.dump(self._training_data, f)
-                return None
+                self._pending_digits.append((features, crop.copy()))
+                if len(self._pending_digits) >= self._LABEL_BATCH_SIZE:
+                    self._learnDigits()
+                return None, 0.0
             else:
                 # Perform classification
                 if w > self._OCR_HEIGHT:  # More than 1 digit, fall back to Tesseract
                     logging.warning("Falling back to Tesseract!")
-                    padded_img = 255 - cv2.copyMakeBorder(img[y:y + h, x:x + w], 5, 5, 5, 5, cv2.BORDER_CONSTANT, None,
-                                                          (0, 0, 0))
-                    config = '--oem 1 --psm 8 {} -l digits'.format(TESSDATA_CONFIG)
-                    string = pytesseract.image_to_string(
-                        Image.fromarray(padded_img),
-                        config=config).strip()
-
-                    if string and string.isdigit():
-                        digits.append((string, segments[0, 0]))
+                    padded_img = 255 - cv2.copyMakeBorder(crop, 5, 5, 5, 5, cv2.BORDER_CONSTANT, None, (0, 0, 0))
+                    fallbacks.append((padded_img, x))
                     continue
 
                 # Use KNN
-                digit, _, _, _ = self._knn.findNearest(features, k=3)
-                digits.append((int(digit), segments[0, 0]))
+                digit, digit_confidence = self._digits.findNearestConfidence(features, k=3)
+                digits.append((int(digit[0]), x))
+                confidence = min(confidence, float(digit_confidence[0]))
+
+        if fallbacks:
+            config = '--oem 1 {} -l digits'.format(TESSDATA_CONFIG)
+            for string, (_, x) in zip(self._read_crops([padded for padded, _ in fallbacks], config), fallbacks):
+                if string and string.isdigit():
+                    digits.append((string, x))
+                    confidence = min(confidence, self._TESSERACT_CONFIDENCE)
 
         fullNumber = ''
         for digit, _ in sorted(digits, key=lambda x: x[1]):
             fullNumber += str(digit)
 
         if fullNumber != '':
-            return int(fullNumber)
+            return int(fullNumber), confidence
+        return None, 0.0
 
     def _getMatchKey(self, raw_match_name):
         for reg, comp_level, tiebreaker in MATCH_ID_FORMATS:
@@ -358,16 +865,13 @@ class LivescoreBase(object):
                     return 'test'
         return None
 
-    def _checkSaturated(self, img, point):
-        bgr = img[point[1], point[0], :]
-        hsv = colorsys.rgb_to_hsv(float(bgr[2]) / 255, float(bgr[1]) / 255, float(bgr[0]) / 255)
-        return hsv[1] > 0.2
-
     def _matchTemplate(self, img, templates):
-        scale = self._transform['scale'] * self._TEMPLATE_SCALE
+        scale = self._transform['scale'] * self._template_scale
         best_max_val = 0
         matched_key = None
         for key, template_img in templates.items():
+            if img.ndim == 2:
+                template_img = cv2.cvtColor(template_img, cv2.COLOR_BGR2GRAY)
             template_img = cv2.resize(template_img, (
                 int(np.round(template_img.shape[1] * scale)), int(np.round(template_img.shape[0] * scale))))
             res = cv2.matchTemplate(img, template_img, cv2.TM_CCOEFF)
@@ -380,16 +884,133 @@ class LivescoreBase(object):
     def _drawBox(self, img, box, color):
         cv2.polylines(img, [box], True, color, 2, cv2.LINE_AA)
 
-    def read(self, img, force_find_overlay=False):
-        img = cv2.resize(img, (1280, 720))
+    def _resizeFrame(self, img):
+        # Scales the frame to 720p, reusing the same buffer every frame
+        if img.shape[:2] == (720, 1280):
+            return img
+        return cv2.resize(img, (1280, 720), dst=self._buffers.get('frame', (720, 1280) + img.shape[2:], img.dtype))
+
+    def _splitFrame(self, img, frame_format):
+        # Returns the 720p, or native resolution, image that overlay detection and OCR run on, which is the luma plane
+        # for gray and YUV frames, and keeps the chroma planes of YUV frames for the color probes
+        if frame_format not in FRAME_FORMATS:
+            raise ValueError("Unknown frame format {}, expected one of {}".format(frame_format, FRAME_FORMATS))
+        self._chroma = None
+        self._full_range_luma = frame_format == 'gray'
+        if frame_format in ('nv12', 'i420'):
+            height = img.shape[0] * 2 // 3
+            width = img.shape[1]
+            chroma = img[height:]
+            if frame_format == 'nv12':
+                # Interleaved UV rows
+                uv = chroma.reshape(height // 2, width // 2, 2)
+                self._chroma = (uv[:, :, 0], uv[:, :, 1])
+            else:
+                # U plane followed by V plane, each packed contiguously regardless of the row width
+                chroma = chroma.reshape(-1)
+                size = (height // 2) * (width // 2)
+                self._chroma = (chroma[:size].reshape(height // 2, width // 2),
+                                chroma[size:2 * size].reshape(height // 2, width // 2))
+            img = img[:height]
+        if self._NATIVE_RESOLUTION:
+            width = img.shape[1]
+            self._useTemplate(min(self._overlay_templates, key=lambda res: abs(res * self._TEMPLATE_SHAPE[0] - width)))
+            return img
+        return self._resizeFrame(img)
+
+    def _getDebugImage(self, img):
+        if img.ndim == 2:
+            return cv2.cvtColor(img, cv2.COLOR_GRAY2BGR, dst=self._buffers.get('debug', img.shape + (3,)))
+        return self._buffers.copy('debug', img)
+
+    def _readDetails(self, img, force_find_overlay):
+        # Reads the match details at the current transform, with the confidence of every ROI and probe read
+        if self._is_new_overlay or force_find_overlay:
+            self._roi_reads = {}
+        self._confidence = {}
+        self._probes = None
+        details = self._getMatchDetails(img, force_find_overlay)
+        if details is not None:
+            details.confidence = dict(self._confidence)
+            if self._probes is not None:
+                details.confidence.update(self._probes.confidence)
+        return details
+
+    def read(self, img, force_find_overlay=False, frame_format='bgr'):
+        img = self._splitFrame(img, frame_format)
         self._findScoreOverlay(img, force_find_overlay)
-        return self._getMatchDetails(img, force_find_overlay)
-
-    def train(self, img, force_find_overlay=False):
-        img = cv2.resize(img, (1280, 720))
+        return self._readDetails(img, force_find_overlay)
+
+    def readAll(self, img, force_find_overlay=False, frame_format='bgr'):
+        # Reads every overlay of the frame, such as both fields of a split screen broadcast, from one detection pass
+        # Returns a list of OngoingMatchDetails, or None for overlays that can't be read, ordered left to right
+        img = self._splitFrame(img, frame_format)
+        self._frame_size = (img.shape[1], img.shape[0])
+        if force_find_overlay or not self._overlays or any(
+                self._overlayCorrelation(img, overlay['transform']) < self._OVERLAY_CORRELATION_THRESHOLD
+                for overlay in self._overlays):
+            transforms = sorted(self._findScoreOverlays(img), key=lambda t: (t['tx'], t['ty']))
+            self._overlays = [{
+                'transform': transform,
+                'match_key': None,
+                'match_name': None,
+                'roi_strip': None,
+                'roi_strip_transform': None,
+                'roi_reads': {},
+            } for transform in transforms]
+            if not self._overlays:
+                raise NoOverlayFoundException("No overlays found")
+
+        details = []
+        for overlay in self._overlays:
+            # Each overlay keeps its own transform, match and ROI strip between frames
+            self._transform = overlay['transform']
+            self._match_key = overlay['match_key']
+            self._match_name = overlay['match_name']
+            self._roi_strip = overlay['roi_strip']
+            self._roi_strip_transform = overlay['roi_strip_transform']
+            self._roi_reads = overlay['roi_reads']
+            self._is_new_overlay = False
+            details.append(self._readDetails(img, False))
+            overlay['match_key'] = self._match_key
+            overlay['match_name'] = self._match_name
+            overlay['roi_strip'] = self._roi_strip
+            overlay['roi_strip_transform'] = self._roi_strip_transform
+            overlay['roi_reads'] = self._roi_reads
+        # read() searches again rather than tracking whichever overlay was read last
+        self._transform = None
+        self._roi_strip_transform = None
+        self._roi_reads = {}
+        return details
+
+    def _readAt(self, img, transform, frame_format='bgr'):
+        # Reads a frame with an overlay transform found elsewhere, such as by year detection, relative to the 1280
+        # wide template in the frame scaled to 720p
+        img = self._splitFrame(img, frame_format)
+        self._frame_size = (img.shape[1], img.shape[0])
+        self._transform = self._mapTransform(img, transform, (1280, 720))
+        self._is_new_overlay = True
+        return self._readDetails(img, False)
+
+    def train(self, img, force_find_overlay=False, frame_format='bgr'):
+        img = self._splitFrame(img, frame_format)
         self._findScoreOverlay(img, force_find_overlay)
         self._getMatchDetails(img, force_find_overlay)
 
+    def __del__(self):
+        # A reader discarded before the process exits learns and journals its pending digits first
+        if getattr(self, '_journal', None) is not None:
+            self._learnDigits()
+            self._journal.flush()
+
     def saveTrainingData(self):
+        if self._journal is not None:
+            self._learnDigits()
+            self._journal.flush()
+        model = self._digits.model
+        training_data = {
+            'features': model[:, 1:].astype(np.float64),
+            'classes': model[:, :1].astype(np.float64),
+        }
         with open('training_data.pkl', 'wb') as output:
-            pickle.dump(self._training_data, output, pickle.HIGHEST_PROTOCOL)
+            pickle.dump(training_data, output, pickle.HIGHEST_PROTOCOL)
@@ -1,4 +1,3 @@
-import colorsys
 import cv2
 from PIL import Image
 import pkg_resources
@@ -8,6 +7,17 @@ from .details import Alliance, OngoingMatchDetails
 
 
 class LivescoreCommon(LivescoreBase):
+    _PROBES = {
+        'review': [(624, 93), (1279 - 624, 93)],
+        'mode': [(520, 70), (581, 70)],
+        'color': [(520, 95)],
+    }
+    _ROIS = {
+        'time': ((640 - 25, 56), (640 + 25, 82), False),
+        'left_score': ((520, 110), (634, 155), True),
+        'right_score': ((644, 110), (760, 155), True),
+    }
+
     def __init__(self, game_year, **kwargs):
         super(LivescoreCommon, self).__init__(game_year, **kwargs)
         self._match_key = None
@@ -31,83 +41,57 @@ class LivescoreCommon(LivescoreBase):
 
         return self._match_key, self._match_name
 
-    def _getTimeAndMode(self, img, debug_img):
+    def _getTimeAndMode(self, img, debug_img, probes, rois):
         # Check for match under review
-        review_point1 = self._transformPoint((624, 93))
-        review_sample1 = img[review_point1[1], review_point1[0], :]
-        hsvL = colorsys.rgb_to_hsv(float(review_sample1[2])/255, float(review_sample1[1])/255, float(review_sample1[0])/255)
-        review_point2 = self._transformPoint((1279 - 624, 93))
-        review_sample2 = img[review_point2[1], review_point2[0], :]
-        hsvR = colorsys.rgb_to_hsv(float(review_sample2[2])/255, float(review_sample2[1])/255, float(review_sample2[0])/255)
-        if 0.116 < hsvL[0] < 0.216 and 0.116 < hsvR[0] < 0.216:
+        if probes.isHueInRange('review', self._YELLOW_HUE_LOW, self._YELLOW_HUE_HIGH).all():
             return 0, 'post_match'
 
         # Find time remaining
-        horiz_center = self._TEMPLATE_SHAPE[0]/2
-        tl = self._transformPoint((horiz_center-25, 56))
-        br = self._transformPoint((horiz_center+25, 82))
-        time_remaining = self._parseDigits(self._getImgCropThresh(img, tl, br))
+        time_remaining = self._readDigits(rois, 'time')
 
         if self._debug:
             # draw a green box for time
-            box = self._cornersToBox(tl, br)
+            box = self._cornersToBox(*rois.getCorners('time'))
             self._drawBox(debug_img, box, (0, 255, 0))
 
         # Determine mode: 'pre_match', 'auto', 'teleop', or 'post_match'
-        mode_point = self._transformPoint((520, 70))
-        mode_point2 = self._transformPoint((581, 70))
-        mode_sample = img[mode_point[1], mode_point[0], :]
-        mode_sample2 = img[mode_point2[1], mode_point2[0], :]
-
-        hsv1 = colorsys.rgb_to_hsv(float(mode_sample[2])/255, float(mode_sample[1])/255, float(mode_sample[0])/255)
-        hsv2 = colorsys.rgb_to_hsv(float(mode_sample2[2])/255, float(mode_sample2[1])/255, float(mode_sample2[0])/255)
+        mode_saturated = probes.isSaturated('mode', 0.6)
 
         if time_remaining is None:
             return None, None
 
         if time_remaining == 0:
-            if hsv1[1] > 0.6 and hsv2[1] > 0.6:  # Both saturated
+            if mode_saturated.all():  # Both saturated
                 mode = 'post_match'
-            elif hsv1[1] > 0.6:  # First saturated
+            elif mode_saturated[0]:  # First saturated
                 mode = 'auto'  # End of auton
             else:
                 mode = 'pre_match'
-        elif time_remaining <= 15 and hsv2[1] < 0.6:
+        elif time_remaining <= 15 and not mode_saturated[1]:
             mode = 'auto'
         else:
             mode = 'teleop'
 
         if self._debug:
-            box = self._cornersToBox(tl, br)
+            box = self._cornersToBox(*rois.getCorners('time'))
             self._drawBox(debug_img, box, (0, 255, 0))
-            cv2.circle(debug_img, review_point1, 2, (0, 255, 0), -1)
-            cv2.circle(debug_img, review_point2, 2, (0, 255, 0), -1)
-            cv2.circle(debug_img, mode_point, 2, (0, 255, 0), -1)
-            cv2.circle(debug_img, mode_point2, 2, (0, 255, 0), -1)
+            for point in probes.getPoints('review') + probes.getPoints('mode'):
+                cv2.circle(debug_img, point, 2, (0, 255, 0), -1)
 
         return time_remaining, mode
 
-    def _getFlipped(self, img, debug_img):
+    def _getFlipped(self, img, debug_img, probes):
         # Sample point to determine red/blue side
-        color_point = self._transformPoint((520, 95))
-        color_sample = img[color_point[1], color_point[0], :]
-        is_flipped = color_sample[0] > color_sample[2]  # More blue than red
+        is_flipped = bool(probes.isBlue('color')[0])
 
         if self._debug:
-            cv2.circle(debug_img, color_point, 2, (0, 255, 0), -1)
+            cv2.circle(debug_img, probes.getPoints('color')[0], 2, (0, 255, 0), -1)
 
         return is_flipped
 
-    def _getScores(self, img, debug_img, is_flipped):
-        # Left score limits
-        left_tl = self._transformPoint((520, 110))
-        left_br = self._transformPoint((634, 155))
-        # Right score limits
-        right_tl = self._transformPoint((644, 110))
-        right_br = self._transformPoint((760, 155))
-
-        left_score = self._parseDigits(self._getImgCropThresh(img, left_tl, left_br, white=True))
-        right_score = self._parseDigits(self._getImgCropThresh(img, right_tl, right_br, white=True))
+    def _getScores(self, img, debug_img, rois, is_flipped):
+        left_score = self._readDigits(rois, 'left_score')
+        right_score = self._readDigits(rois, 'right_score')
 
         if is_flipped:
             red_score = right_score
@@ -117,8 +101,8 @@ class LivescoreCommon(LivescoreBase):
             blue_score = right_score
 
         if self._debug:
-            left_box = self._cornersToBox(left_tl, left_br)
-            right_box = self._cornersToBox(right_tl, right_br)
+            left_box = self._cornersToBox(*rois.getCorners('left_score'))
+            right_box = self._cornersToBox(*rois.getCorners('right_score'))
             self._drawBox(debug_img, left_box, (255, 255, 0) if is_flipped else (255, 0, 255))
             self._drawBox(debug_img, right_box, (255, 0, 255) if is_flipped else (255, 255, 0))
 
@@ -127,14 +111,16 @@ class LivescoreCommon(LivescoreBase):
     def _getMatchDetails(self, img, force_find_overlay):
         debug_img = None
         if self._debug:
-            debug_img = img.copy()
+            debug_img = self._getDebugImage(img)
 
-        time_remaining, mode = self._getTimeAndMode(img, debug_img)
+        probes = self._sampleProbes(img)
+        rois = self._getRoisThresh(img)
+        time_remaining, mode = self._getTimeAndMode(img, debug_img, probes, rois)
         if self._is_new_overlay or force_find_overlay:
             self._match_key = None
         match_key, match_name = self._getMatchKeyName(img, debug_img)
-        is_flipped = self._getFlipped(img, debug_img)
-        red_score, blue_score = self._getScores(img, debug_img, is_flipped)
+        is_flipped = self._getFlipped(img, debug_img, probes)
+        red_score, blue_score = self._getScores(img, debug_img, rois, is_flipped)
 
         box = self._cornersToBox(self._transformPoint((0, 0)), self._transformPoint((1280, 170)))
         self._drawBox(debug_img, box, (255, 255, 0))
@@ -6,4 +6,5 @@ from .Livescore2018 import Livescore2018
 from .Livescore2019 import Livescore2019
 from .Livescore2020 import Livescore2020
 from .Livescore2021 import Livescore2021
-from .Livescore2022 import Livescore2022
\ No newline at end of file
+from .Livescore2022 import Livescore2022
+from .LivescoreAuto import LivescoreAuto
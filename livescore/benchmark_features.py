@@ -0,0 +1,82 @@
+import argparse
+import os
+import time
+
+import numpy as np
+
+from .LivescoreAuto import READERS
+from .features import DETECTORS, MATCHERS
+from .prune_keypoints import corner_error, find_transforms, load_frames
+
+
+def load_corpus(images_dir):
+    # Frames from each year's subdirectory, with the overlay transforms the default reader finds in them as reference
+    corpus = {}
+    for name in sorted(os.listdir(images_dir)):
+        if name.isdigit() and int(name) in READERS:
+            frc = READERS[int(name)]()
+            frames = load_frames(frc, [os.path.join(images_dir, name)])
+            corpus[int(name)] = (frames, find_transforms(frc, frames))
+    return corpus
+
+
+def benchmark(corpus, detector, matcher, tolerance=2):
+    """searches every frame of the corpus with a detector and matcher backend, returning the median search time in
+    milliseconds, mean number of good matches and median corner error in pixels for frames with an overlay, the
+    fraction of those where it's found within tolerance pixels, and the number of frames without an overlay where one
+    is found anyway"""
+    times = []
+    matches = []
+    errors = []
+    false_positives = 0
+    for year, (frames, transforms) in corpus.items():
+        frc = READERS[year](detector=detector, matcher=matcher)
+        for img, transform in zip(frames, transforms):
+            start = time.perf_counter()
+            t, num_good = frc._matchOverlay(img, frc._detector, frc._template, frc._kp1, frc._des1)
+            times.append(time.perf_counter() - start)
+            if transform is None:
+                false_positives += t is not None
+                continue
+            matches.append(num_good)
+            errors.append(np.inf if t is None else corner_error(frc, t, transform))
+    errors = np.float32(errors)
+    return {
+        'detector': detector,
+        'matcher': matcher,
+        'ms': 1000 * np.median(times),
+        'matches': np.mean(matches),
+        'error': np.median(errors[np.isfinite(errors)]) if np.isfinite(errors).any() else np.inf,
+        'accuracy': np.mean(errors < tolerance),
+        'false_positives': false_positives,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compares overlay search with every feature detector and matcher "
+                                                 "backend, ranked by accuracy, then false positives, then speed")
+    parser.add_argument('images', nargs='?', default='tests/images',
+                        help="Directory with a subdirectory of frames for each year")
+    parser.add_argument('--detectors', nargs='+', default=sorted(DETECTORS), choices=sorted(DETECTORS))
+    parser.add_argument('--matchers', nargs='+', default=list(MATCHERS), choices=MATCHERS)
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.images)
+    if not corpus:
+        parser.error("No year subdirectories in {}".format(args.images))
+    num_frames = sum(len(frames) for frames, _ in corpus.values())
+    num_overlays = sum(t is not None for _, transforms in corpus.values() for t in transforms)
+    print("{} frames from {}, {} with an overlay found by orb/flann as reference".format(
+        num_frames, ', '.join(str(year) for year in corpus), num_overlays))
+
+    results = [benchmark(corpus, detector, matcher) for detector in args.detectors for matcher in args.matchers]
+    results.sort(key=lambda r: (-r['accuracy'], r['false_positives'], r['ms']))
+    print("{:>4} {:>8} {:>7} {:>10} {:>8} {:>9} {:>9} {:>16}".format(
+        'rank', 'detector', 'matcher', 'search ms', 'matches', 'error px', 'accuracy', 'false positives'))
+    for rank, r in enumerate(results, 1):
+        print("{:>4} {:>8} {:>7} {:>10.1f} {:>8.0f} {:>9.2f} {:>9.0%} {:>16}".format(
+            rank, r['detector'], r['matcher'], r['ms'], r['matches'], r['error'], r['accuracy'], r['false_positives']))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,23 @@
+import numpy as np
+
+
+class BufferPool(object):
+    """Reusable arrays keyed by name, shape and dtype, so that steady state frame processing can write into the same
+    memory every frame with OpenCV dst= arguments instead of allocating new images"""
+    def __init__(self):
+        self._buffers = {}
+
+    def get(self, name, shape, dtype=np.uint8):
+        key = (name, tuple(shape), np.dtype(dtype))
+        buf = self._buffers.get(key)
+        if buf is None:
+            # Only keep the latest shape for each name so that a changing input size doesn't grow the pool
+            for old_key in [k for k in self._buffers if k[0] == name]:
+                del self._buffers[old_key]
+            buf = self._buffers[key] = np.empty(shape, dtype)
+        return buf
+
+    def copy(self, name, img):
+        buf = self.get(name, img.shape, img.dtype)
+        np.copyto(buf, img)
+        return buf
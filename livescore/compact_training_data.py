@@ -0,0 +1,21 @@
+import argparse
+
+import pkg_resources
+
+from .digits import compact, model_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Merges the digits learned by readers with save_training_data=True "
+                                                 "into the training data and the digit model")
+    parser.add_argument('training_data', nargs='?',
+                        default=pkg_resources.resource_filename('livescore', 'training_data') + '/digits.pkl',
+                        help="Training data pickle, defaults to the one readers use")
+    args = parser.parse_args()
+
+    num_digits = compact(args.training_data)
+    print("Merged {} digits into {} and {}".format(num_digits, args.training_data, model_path(args.training_data)))
+
+
+if __name__ == '__main__':
+    main()
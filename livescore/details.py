@@ -139,13 +139,15 @@ class Alliance2019(Alliance):
         )
 
 class OngoingMatchDetails(object):
-    def __init__(self, match_key=None, match_name=None, mode=None, time=None, red=Alliance(), blue=Alliance()):
+    def __init__(self, match_key=None, match_name=None, mode=None, time=None, red=Alliance(), blue=Alliance(),
+                 confidence=None):
         self.match_key = match_key
         self.match_name = match_name
         self.mode = mode
         self.time = time
         self.red = red
         self.blue = blue
+        self.confidence = confidence or {}  # ROI or probe name -> confidence of its read, from 0 to 1
 
     def __str__(self):
 
@@ -0,0 +1,378 @@
+import logging
+import os
+import pickle
+
+import cv2
+import numpy as np
+
+from .registry import call_at_exit
+
+# Bump when the layout of the model file changes, so that stale models are converted again rather than misread
+MODEL_VERSION = 1
+
+ROW_SIZE = 101  # A model row is a class followed by its 100 features
+
+# Binary model rows are a class byte followed by the features thresholded at BINARY_THRESHOLD, packed 8 to a byte
+BINARY_THRESHOLD = 127
+BINARY_ROW_SIZE = 1 + (ROW_SIZE - 1 + 7) // 8
+
+# Digits further than this from every training digit are unlike any the classifier has seen. Training digits are
+# mostly within 100 of another, and those misclassified by their nearest neighbour over 400 from it
+UNCERTAIN_DISTANCE = 300
+# The Hamming distance in bits that about as many training digits are further than from their nearest
+BINARY_UNCERTAIN_DISTANCE = 4
+
+# Blobs enclosing no more than these many pixels are noise, when finding the height of the digits of an ROI and then
+# its digits at OCR height
+MIN_BLOB_AREA = 50
+MIN_DIGIT_AREA = 100
+
+# Journal row that starts training from scratch, discarding the training data and any rows before it
+RESET_ROW = np.full(ROW_SIZE, np.nan, np.float32)
+
+
+def model_path(pickle_path, binary=False):
+    # The model converted from a training data pickle sits next to it, e.g. digits-v1.npy for digits.pkl, and
+    # digits-v1-binary.npy for the binary model
+    return '{}-v{}{}.npy'.format(os.path.splitext(pickle_path)[0], MODEL_VERSION, '-binary' if binary else '')
+
+
+def journal_path(pickle_path):
+    # Digits learned since the training data was last compacted are journaled next to it, e.g. digits.journal
+    return os.path.splitext(pickle_path)[0] + '.journal'
+
+
+def _write_atomic(path, write):
+    # Writes a file under a temporary name first, so other processes never read it half written
+    tmp_path = '{}.{}.tmp'.format(path, os.getpid())
+    with open(tmp_path, 'wb') as f:
+        write(f)
+    os.replace(tmp_path, path)
+
+
+def load_pickle(pickle_path):
+    """loads legacy training data, a pickled dict of (N, 100) features and (N, 1) classes, as model rows"""
+    with open(pickle_path, 'rb') as f:
+        data = pickle.load(f, encoding='latin1')
+    return np.hstack([data['classes'], data['features']]).astype(np.float32)
+
+
+def save_pickle(pickle_path, model):
+    """saves model rows as legacy training data, a pickled dict of float64 features and classes"""
+    training_data = {
+        'features': model[:, 1:].astype(np.float64),
+        'classes': model[:, :1].astype(np.float64),
+    }
+    _write_atomic(pickle_path, lambda f: pickle.dump(training_data, f))
+
+
+def pack_features(features):
+    """returns (N, 100) digit features thresholded and packed into (N, 13) bytes"""
+    return np.packbits(np.asarray(features).reshape(-1, ROW_SIZE - 1) > BINARY_THRESHOLD, axis=1)
+
+
+def pack_model(model):
+    """returns model rows as binary model rows"""
+    packed = np.empty((len(model), BINARY_ROW_SIZE), np.uint8)
+    packed[:, 0] = model[:, 0]
+    packed[:, 1:] = pack_features(model[:, 1:])
+    return packed
+
+
+def convert_pickle(pickle_path, path=None, binary=False):
+    """converts training data from a pickle to a model file of float32 rows, each a class followed by its features,
+    or of binary model rows"""
+    path = path or model_path(pickle_path, binary)
+    model = load_pickle(pickle_path)
+    # Column major, so that the features of every row can be read as one block without copying them
+    model = pack_model(model) if binary else np.asfortranarray(model)
+    _write_atomic(path, lambda f: np.save(f, model))
+    return path
+
+
+def load_model(pickle_path, binary=False):
+    """memory maps the model converted from a training data pickle, so that every process reading it shares the same
+    pages. The model is converted first if it's missing or older than the pickle, and if it can't be written the
+    pickle is loaded into memory instead"""
+    path = model_path(pickle_path, binary)
+    if not os.path.exists(path) or os.path.getmtime(path) < os.path.getmtime(pickle_path):
+        try:
+            convert_pickle(pickle_path, path, binary)
+        except OSError as e:
+            logging.warning("Couldn't write digit model {}, loading {} instead: {}".format(path, pickle_path, e))
+            model = load_pickle(pickle_path)
+            return pack_model(model) if binary else model
+    return np.load(path, mmap_mode='r')
+
+
+def load_journal(path):
+    """returns the model rows journaled at path, and whether they start training from scratch, discarding the
+    training data they were journaled for"""
+    if not os.path.exists(path):
+        return np.ndarray((0, ROW_SIZE), np.float32), False
+    rows = np.fromfile(path, np.float32)
+    # A row cut short by a crash while it was written is dropped
+    rows = rows[:len(rows) // ROW_SIZE * ROW_SIZE].reshape(-1, ROW_SIZE)
+    resets = np.flatnonzero(np.isnan(rows[:, 0]))
+    if len(resets):
+        return rows[resets[-1] + 1:], True
+    return rows, False
+
+
+def load_classifier(pickle_path, binary=False):
+    """returns a classifier of the training data model, trained with the digits journaled since it was compacted, of
+    binary features if binary is set"""
+    samples, reset = load_journal(journal_path(pickle_path))
+    if reset:
+        model = np.ndarray((0, ROW_SIZE), np.float32)
+        model = pack_model(model) if binary else model
+    else:
+        model = load_model(pickle_path, binary)
+    classifier = BinaryDigitClassifier(model) if binary else DigitClassifier(model)
+    if len(samples):
+        classifier.train(samples)
+    return classifier
+
+
+def compact(pickle_path):
+    """merges the journal into the training data pickle, converts it to a model again and removes the journal.
+    Returns the number of digits merged. Digits journaled by readers running at the same time can be lost"""
+    path = journal_path(pickle_path)
+    if not os.path.exists(path):
+        return 0
+    samples, reset = load_journal(path)
+    save_pickle(pickle_path, samples if reset else np.vstack([load_pickle(pickle_path), samples]))
+    convert_pickle(pickle_path)
+    os.remove(path)
+    return len(samples)
+
+
+def cluster_leaders(features, min_distance):
+    """clusters rows of features greedily in order, returning the indices of the rows at least min_distance from
+    every row kept before them. Each row kept stands in for the near duplicates after it"""
+    leaders = np.empty(len(features), np.intp)
+    leader_features = np.empty(features.shape, np.float32)
+    leader_norms = np.empty(len(features), np.float32)
+    num_leaders = 0
+    for i, f in enumerate(np.asarray(features, np.float32)):
+        norm = f.dot(f)
+        if num_leaders:
+            dist = leader_norms[:num_leaders] - 2 * leader_features[:num_leaders].dot(f) + norm
+            if dist.min() < min_distance ** 2:
+                continue
+        leaders[num_leaders] = i
+        leader_features[num_leaders] = f
+        leader_norms[num_leaders] = norm
+        num_leaders += 1
+    return leaders[:num_leaders]
+
+
+def prune(model, min_distance=50, max_per_class=64):
+    """returns the model rows left after dropping near duplicates, rows within min_distance of a row of the same class
+    before them, in training order. Classes are balanced by widening the distance for those with more than
+    max_per_class rows left until they have at most that many, which keeps their rows as varied as possible"""
+    keep = []
+    for digit_class in np.unique(model[:, 0]):
+        rows = np.flatnonzero(model[:, 0] == digit_class)
+        distance = min_distance
+        leaders = cluster_leaders(model[rows, 1:], distance)
+        while max_per_class and len(leaders) > max_per_class:
+            distance = max(1.25 * distance, 1)
+            leaders = cluster_leaders(model[rows, 1:], distance)
+        keep.append(rows[leaders])
+    return model[np.sort(np.concatenate(keep))] if keep else model
+
+
+class TrainingJournal(object):
+    """Appends learned digits to a journal as model rows, a batch at a time, instead of rewriting all the training
+    data for every digit. Pending digits are also written when the journal is garbage collected or the process exits"""
+    def __init__(self, path, batch_size=64, reset=False):
+        self._path = path
+        self._batch_size = batch_size
+        self._reset = reset  # Start training from scratch with the first batch
+        self._pending = []
+        call_at_exit(self.flush)
+
+    def __del__(self):
+        self.flush()
+
+    def append(self, digit_class, features):
+        row = np.empty(ROW_SIZE, np.float32)
+        row[0] = digit_class
+        row[1:] = np.ravel(features)
+        self._pending.append(row)
+        if len(self._pending) >= self._batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self._pending:
+            return
+        rows = [RESET_ROW] + self._pending if self._reset else self._pending
+        with open(self._path, 'ab') as f:
+            f.write(np.vstack(rows).tobytes())
+        self._reset = False
+        self._pending = []
+
+
+def _blob_boxes(img, mode, min_area):
+    # x, y, w, h boxes of the contours of a binary image that enclose more than min_area pixels
+    # Digit ROIs have a couple of contours each, too few for computing boxes and areas of all of them at once in NumPy
+    # to beat an OpenCV call per contour, so only the filtering is done on arrays
+    contours, _ = cv2.findContours(img, mode, cv2.CHAIN_APPROX_SIMPLE)
+    areas = np.float64([cv2.contourArea(c) for c in contours])
+    boxes = np.int32([cv2.boundingRect(c) for c in contours]).reshape(-1, 4)
+    return boxes[areas > min_area]
+
+
+def segment_digits(img, height, extractor):
+    """segments a thresholded ROI into digits, with one pass over its blobs to find how tall the digits are, and
+    another once it's cropped to them and scaled to height to find each one. Returns the features of every digit,
+    their x, y, w, h boxes left to right, and the scaled ROI the boxes are in"""
+    blobs = _blob_boxes(img, cv2.RETR_LIST, MIN_BLOB_AREA)
+    if not len(blobs):
+        return np.empty((0, extractor.feature_size ** 2), np.float32), blobs, img
+    top = blobs[:, 1].min()
+    bottom = (blobs[:, 1] + blobs[:, 3]).max()
+    img = img[top:bottom, :]
+    scale = float(height) / (bottom - top)
+    img = cv2.resize(img, (int(img.shape[1] * scale), int(img.shape[0] * scale)))
+
+    boxes = _blob_boxes(img, cv2.RETR_EXTERNAL, MIN_DIGIT_AREA)
+    boxes = boxes[np.argsort(boxes[:, 0], kind='stable')]
+    # Features of every digit from one call, which finds the background of the ROI once
+    return extractor.extract(img, boxes), boxes, img
+
+
+def _reserve(buffer, used, size, order='C'):
+    # Returns the buffer if it has room for size rows, or else a copy of its used rows with its capacity doubled, so
+    # that adding rows a few at a time takes amortized constant time
+    if size <= len(buffer):
+        return buffer
+    grown = np.empty((max(size, 2 * len(buffer), 64),) + buffer.shape[1:], buffer.dtype, order=order)
+    grown[:used] = buffer[:used]
+    return grown
+
+
+def _vote(neighbours):
+    # The most common class of each row of neighbour classes, the lowest on a tie
+    results = np.empty(len(neighbours), np.float32)
+    for i, classes in enumerate(neighbours):
+        labels, counts = np.unique(classes, return_counts=True)
+        results[i] = labels[np.argmax(counts)]
+    return results
+
+
+def _confidences(neighbours, distances, classes, max_distance):
+    # The fraction of the neighbours of each row voting for its class, scaled down by how much further than
+    # max_distance the nearest of them is
+    votes = neighbours == classes[:, None]
+    nearest = np.where(votes, distances, np.inf).min(axis=1)
+    return votes.mean(axis=1) * np.minimum(1, max_distance / np.maximum(nearest, 1e-6))
+
+
+class DigitClassifier(object):
+    """k nearest neighbour digit classifier reading model rows in place, so that a memory mapped model isn't copied.
+    Gives the same results as cv2.ml.KNearest: the most common class of the k nearest neighbours, the lowest on a
+    tie"""
+    _MAX_DISTANCE = UNCERTAIN_DISTANCE
+
+    def __init__(self, model):
+        self._model = model  # Rows in use are followed by spare capacity once trained
+        self._size = len(model)
+        self._norms = np.square(model[:, 1:]).sum(axis=1)
+
+    @property
+    def model(self):
+        return self._model[:self._size]
+
+    def train(self, samples):
+        """adds model rows to the classifier. Rows are copied into a buffer with spare capacity, so adding a digit at
+        a time takes amortized constant time"""
+        samples = np.asarray(samples, np.float32).reshape(-1, ROW_SIZE)
+        size = self._size + len(samples)
+        self._model = _reserve(self._model, self._size, size, order='F')
+        self._norms = _reserve(self._norms, self._size, size)
+        self._model[self._size:size] = samples
+        self._norms[self._size:size] = np.square(samples[:, 1:]).sum(axis=1)
+        self._size = size
+
+    def findNeighbours(self, features, k):
+        """returns the classes of the k nearest training digits to each row of features, nearest first, and their
+        Euclidean distances"""
+        model, norms = self.model, self._norms[:self._size]
+        features = np.asarray(features, np.float32).reshape(-1, ROW_SIZE - 1)
+        k = min(k, self._size)
+        classes = np.empty((len(features), k), np.float32)
+        distances = np.empty((len(features), k), np.float32)
+        if not k:
+            return classes, distances
+        for i, f in enumerate(features):
+            # Squared distances are exact since the features are whole numbers, so ties stay in training order
+            dist = norms - 2 * model[:, 1:].dot(f) + f.dot(f)
+            candidates = np.flatnonzero(dist <= np.partition(dist, k - 1)[k - 1])
+            nearest = candidates[np.argsort(dist[candidates], kind='stable')[:k]]
+            classes[i] = model[nearest, 0]
+            distances[i] = np.sqrt(np.maximum(dist[nearest], 0))
+        return classes, distances
+
+    def findNearest(self, features, k):
+        return _vote(self.findNeighbours(features, k)[0])
+
+    def findNearestConfidence(self, features, k):
+        """returns the class of each row of features, voted by its k nearest training digits, and the confidence of
+        each vote from 0 to 1"""
+        neighbours, distances = self.findNeighbours(features, k)
+        classes = _vote(neighbours)
+        return classes, _confidences(neighbours, distances, classes, self._MAX_DISTANCE)
+
+    def isUncertain(self, features, digit_class, k=3, max_distance=UNCERTAIN_DISTANCE):
+        """returns whether a digit of a known class would teach the classifier something: it's misclassified, its k
+        nearest neighbours don't agree, or it's further than max_distance from every training digit"""
+        neighbours, distances = self.findNeighbours(features, k)
+        if not neighbours.size:
+            return True
+        classes = np.unique(neighbours[0])
+        return len(classes) > 1 or classes[0] != digit_class or distances[0, 0] > max_distance
+
+
+class BinaryDigitClassifier(object):
+    """k nearest neighbour digit classifier of binary model rows, matching features by the Hamming distance between
+    their packed bits. The model takes a 29th of the memory of DigitClassifier's and is faster to search, but the
+    thresholded features tell a few digits apart less well"""
+    _MAX_DISTANCE = BINARY_UNCERTAIN_DISTANCE
+
+    def __init__(self, model):
+        self._model = model  # Rows in use are followed by spare capacity once trained
+        self._size = len(model)
+
+    @property
+    def model(self):
+        return self._model[:self._size]
+
+    def train(self, samples):
+        """adds model rows of float features to the classifier, packing them"""
+        samples = pack_model(np.asarray(samples, np.float32).reshape(-1, ROW_SIZE))
+        size = self._size + len(samples)
+        self._model = _reserve(self._model, self._size, size)
+        self._model[self._size:size] = samples
+        self._size = size
+
+    def findNeighbours(self, features, k):
+        """returns the classes of the k nearest training digits to each row of features, nearest first, and their
+        Hamming distances"""
+        codes = pack_features(np.asarray(features, np.float32))
+        k = min(k, self._size)
+        if not k:
+            return np.empty((len(codes), 0), np.float32), np.empty((len(codes), 0), np.float32)
+        distances, indices = cv2.batchDistance(codes, self.model[:, 1:], cv2.CV_32S, normType=cv2.NORM_HAMMING, K=k)
+        return self.model[indices, 0].astype(np.float32), distances.astype(np.float32)
+
+    def findNearest(self, features, k):
+        return _vote(self.findNeighbours(features, k)[0])
+
+    def findNearestConfidence(self, features, k):
+        """returns the class of each row of features, voted by its k nearest training digits, and the confidence of
+        each vote from 0 to 1"""
+        neighbours, distances = self.findNeighbours(features, k)
+        classes = _vote(neighbours)
+        return classes, _confidences(neighbours, distances, classes, self._MAX_DISTANCE)
@@ -0,0 +1,139 @@
+from concurrent.futures import ThreadPoolExecutor
+import os
+
+import cv2
+import numpy as np
+
+from .registry import shared
+
+# Feature detectors the overlay can be found with. All of them have binary descriptors, so any of them works with
+# either matcher
+DETECTORS = {
+    'orb': lambda: cv2.ORB_create(nfeatures=10000),
+    'akaze': lambda: cv2.AKAZE_create(),
+    'brisk': lambda: cv2.BRISK_create(),
+}
+
+MATCHERS = ('flann', 'bf')
+
+
+def create_detector(name):
+    if name not in DETECTORS:
+        raise ValueError("Unknown detector {}, expected one of {}".format(name, tuple(DETECTORS)))
+    return DETECTORS[name]()
+
+
+def _lsh_params(multi_probe_level):
+    # Index and search parameters of the FLANN LSH index both matchers use, probing multi_probe_level neighbouring
+    # buckets
+    FLANN_INDEX_LSH = 6
+    index_params = dict(
+        algorithm=FLANN_INDEX_LSH,
+        table_number=6,
+        key_size=12,
+        multi_probe_level=multi_probe_level
+    )
+    search_params = dict(checks=50)
+    return index_params, search_params
+
+
+def create_matcher(name, multi_probe_level=1):
+    """creates a Hamming distance matcher, either FLANN with an LSH index, which probes multi_probe_level neighbouring
+    buckets, or brute force"""
+    if name == 'flann':
+        return cv2.FlannBasedMatcher(*_lsh_params(multi_probe_level))
+    if name == 'bf':
+        return cv2.BFMatcher(normType=cv2.NORM_HAMMING)
+    raise ValueError("Unknown matcher {}, expected one of {}".format(name, MATCHERS))
+
+
+class KnnMatcher(object):
+    """Finds the k nearest train descriptors to each query descriptor by Hamming distance, either with a FLANN LSH
+    index or by brute force. Unlike the OpenCV matchers' knnMatch(), the neighbours come back as (queries, k) arrays of
+    distances and train indices, with an infinite distance and -1 index where a query has fewer than k."""
+    def __init__(self, name, multi_probe_level=1):
+        if name not in MATCHERS:
+            raise ValueError("Unknown matcher {}, expected one of {}".format(name, MATCHERS))
+        self._name = name
+        self._index_params, self._search_params = _lsh_params(multi_probe_level)
+
+    def index(self, train):
+        """returns the train descriptors indexed for searching again and again with knnSearch()"""
+        return KnnIndex(self, train)
+
+    def knnSearch(self, query, train, k):
+        return self.index(train).knnSearch(query, k)
+
+
+class KnnIndex(object):
+    """Train descriptors indexed by a KnnMatcher, for searching many query sets without indexing them again"""
+    def __init__(self, matcher, train):
+        self._train = train
+        self._search_params = matcher._search_params
+        self._flann = cv2.flann_Index(train, matcher._index_params) if matcher._name == 'flann' else None
+
+    def knnSearch(self, query, k):
+        train = self._train
+        n = min(k, len(train))
+        if self._flann is not None:
+            indices, distances = self._flann.knnSearch(query, n, params=self._search_params)
+        else:
+            distances, indices = cv2.batchDistance(query, train, cv2.CV_32S, normType=cv2.NORM_HAMMING, K=n)
+        found = indices >= 0
+        neighbours = np.full((len(query), k), -1, np.int32)
+        neighbours[:, :n] = np.where(found, indices, -1)
+        neighbour_distances = np.full((len(query), k), np.inf, np.float32)
+        neighbour_distances[:, :n] = np.where(found, distances, np.inf)
+        return neighbour_distances, neighbours
+
+
+class TiledDetector(object):
+    """Detects features in overlapping tiles of an image on a thread pool, giving each tile its share of the feature
+    budget. Each tile is padded so that keypoints near its edges are detected and described as they would be in the
+    whole image, and keeps only the keypoints in its own unpadded part, so none are duplicated. Has the same
+    detectAndCompute() as the detectors."""
+    def __init__(self, name, tiles):
+        self._cols, self._rows = tiles
+        num_tiles = self._cols * self._rows
+        self._detectors = [create_detector(name) for _ in range(num_tiles)]
+        detector = self._detectors[0]
+        if hasattr(detector, 'getMaxFeatures'):
+            for d in self._detectors:
+                d.setMaxFeatures(max(1, d.getMaxFeatures() // num_tiles))
+            # Border ORB leaves at its coarsest pyramid level, in full resolution pixels
+            self._margin = int(np.ceil(detector.getEdgeThreshold() *
+                                       detector.getScaleFactor() ** (detector.getNLevels() - 1)))
+        else:
+            self._margin = 64
+        # Every tiled detector in the process shares one pool, so readers don't each keep idle threads alive
+        self._pool = shared(('tile_pool',), lambda: ThreadPoolExecutor(max_workers=os.cpu_count() or 1))
+
+    def _detectTile(self, detector, img, core):
+        x0, y0, x1, y1 = core
+        px0 = max(0, x0 - self._margin)
+        py0 = max(0, y0 - self._margin)
+        px1 = min(img.shape[1], x1 + self._margin)
+        py1 = min(img.shape[0], y1 + self._margin)
+        kp, des = detector.detectAndCompute(img[py0:py1, px0:px1], None)
+        keypoints = []
+        keep = []
+        for i, k in enumerate(kp):
+            x, y = k.pt[0] + px0, k.pt[1] + py0
+            if x0 <= x < x1 and y0 <= y < y1:
+                k.pt = (x, y)
+                keypoints.append(k)
+                keep.append(i)
+        return keypoints, des[keep] if des is not None else None
+
+    def detectAndCompute(self, img, mask=None):
+        height, width = img.shape[:2]
+        cores = [(width * c // self._cols, height * r // self._rows,
+                  width * (c + 1) // self._cols, height * (r + 1) // self._rows)
+                 for r in range(self._rows) for c in range(self._cols)]
+        keypoints = []
+        descriptors = []
+        for kp, des in self._pool.map(self._detectTile, self._detectors, [img] * len(cores), cores):
+            keypoints.extend(kp)
+            if des is not None and len(des):
+                descriptors.append(des)
+        return keypoints, np.vstack(descriptors) if descriptors else None
@@ -0,0 +1,196 @@
+import argparse
+import multiprocessing
+import os
+import time
+
+import cv2
+import numpy as np
+
+from .LivescoreAuto import READERS
+from .LivescoreBase import TRAINING_DATA_FILE, NoOverlayFoundException
+from .digits import (ROW_SIZE, UNCERTAIN_DISTANCE, DigitClassifier, convert_pickle, journal_path, load_classifier,
+                     save_pickle)
+
+VIDEO_EXTENSIONS = ('.mp4', '.mkv', '.avi', '.mov', '.webm', '.ts')
+
+# Reader of each worker process, created by _init_worker
+_reader = None
+
+
+def _init_worker(year, **kwargs):
+    global _reader
+    _reader = READERS[year](**kwargs)
+
+
+def dedupe_key(features, step=64):
+    """returns a hashable key of digit features, which is the same for digits whose features round to the same
+    multiples of step, such as the same digit crop from consecutive frames"""
+    return np.round(np.asarray(features) / step).astype(np.uint8).tobytes()
+
+
+def split_sources(paths, frames_per_task=3000):
+    """splits videos, images and directories of either into tasks of up to frames_per_task frames each, as
+    (path, first frame, end frame) for videos and lists of image paths for images"""
+    tasks = []
+    images = []
+    for path in paths:
+        names = sorted(os.path.join(path, n) for n in os.listdir(path)) if os.path.isdir(path) else [path]
+        for name in names:
+            if os.path.splitext(name)[1].lower() in VIDEO_EXTENSIONS:
+                cap = cv2.VideoCapture(name)
+                num_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+                cap.release()
+                tasks.extend((name, start, min(start + frames_per_task, num_frames))
+                             for start in range(0, num_frames, frames_per_task))
+            else:
+                images.append(name)
+    tasks.extend(images[i:i + frames_per_task] for i in range(0, len(images), frames_per_task))
+    return tasks
+
+
+def _frames(task, every):
+    # Yields every nth frame of a task from split_sources
+    if isinstance(task, tuple):
+        path, start, stop = task
+        cap = cv2.VideoCapture(path)
+        cap.set(cv2.CAP_PROP_POS_FRAMES, start)
+        for i in range(start, stop):
+            # Skipped frames are only grabbed, not converted
+            if (i - start) % every:
+                if not cap.grab():
+                    break
+                continue
+            ok, img = cap.read()
+            if not ok:
+                break
+            yield img
+        cap.release()
+    else:
+        for name in task[::every]:
+            img = cv2.imread(name)
+            if img is not None:
+                yield img
+
+
+def _harvest_task(args):
+    # Finds the overlay in every nth frame of a task and returns its unique digits as key -> [features, crop, count]
+    task, every = args
+    frc = _reader
+    digits = {}
+    for img in _frames(task, every):
+        img = frc._splitFrame(img, 'bgr')
+        try:
+            frc._findScoreOverlay(img, False)
+        except NoOverlayFoundException:
+            continue
+        rois = frc._getRoisThresh(img)
+        for name in frc._ROIS:
+            for features, _, crop in frc._segmentDigits(rois.getImage(name)):
+                if crop.shape[1] > frc._OCR_HEIGHT:  # Junk, or more than 1 digit
+                    continue
+                key = dedupe_key(features)
+                if key in digits:
+                    digits[key][2] += 1
+                else:
+                    digits[key] = [features.reshape(-1), crop.copy(), 1]
+    return digits
+
+
+def harvest(year, paths, every=1, workers=None):
+    """finds the digits in every nth frame of the videos, images and directories of either at paths, across worker
+    processes, and returns the unique ones as key -> [features, crop, count], with how many times each was seen"""
+    digits = {}
+    with multiprocessing.Pool(workers, _init_worker, (year,)) as pool:
+        tasks = [(task, every) for task in split_sources(paths)]
+        for task_digits in pool.imap_unordered(_harvest_task, tasks):
+            for key, (features, crop, count) in task_digits.items():
+                if key in digits:
+                    digits[key][2] += count
+                else:
+                    digits[key] = [features, crop, count]
+    return digits
+
+
+def _label_batch(crops):
+    return _reader._labelDigits(crops)
+
+
+def _init_label_worker(year, montage_ocr):
+    _init_worker(year, montage_ocr=montage_ocr)
+
+
+def label(year, crops, workers=None, batch_size=64, montage_ocr=False):
+    """labels digit crops with Tesseract in batches across worker processes, returning each one's class or None. With
+    montage_ocr each batch is read with one call"""
+    with multiprocessing.Pool(workers, _init_label_worker, (year, montage_ocr)) as pool:
+        batches = [crops[i:i + batch_size] for i in range(0, len(crops), batch_size)]
+        return [c for labels in pool.imap(_label_batch, batches) for c in labels]
+
+
+def select_uncertain(base, rows, max_distance=UNCERTAIN_DISTANCE):
+    """returns the labelled model rows that a classifier of the base model rows is unsure of or gets wrong, in order.
+    Each row kept is learned before the next is checked, so rows like one already kept are left out"""
+    digits = DigitClassifier(base)
+    keep = []
+    for row in rows:
+        if digits.isUncertain(row[1:], row[0], max_distance=max_distance):
+            digits.train(row)
+            keep.append(row)
+    return np.float32(keep).reshape(-1, ROW_SIZE)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Harvests digit training data from videos and frames of a year's "
+                                                 "matches, and saves it with the model converted from it")
+    parser.add_argument('year', type=int, choices=sorted(READERS))
+    parser.add_argument('sources', nargs='+', help="Videos, images, or directories of either")
+    parser.add_argument('--every', type=int, default=1, help="Only read every nth frame")
+    parser.add_argument('--workers', type=int, help="Worker processes, defaults to one per CPU")
+    parser.add_argument('--append', action='store_true', help="Add to the training data readers use")
+    parser.add_argument('--output', default='digits.pkl', help="Training data pickle to save")
+    parser.add_argument('--active', action='store_true',
+                        help="Only keep digits the training data so far is unsure of or gets wrong")
+    parser.add_argument('--max-distance', type=float, default=UNCERTAIN_DISTANCE,
+                        help="With --active, digits further than this from every digit kept are unsure")
+    parser.add_argument('--montage', action='store_true', help="Label many digits per Tesseract call")
+    parser.add_argument('--compare-montage', action='store_true',
+                        help="Also label the digits many per call, and report how often that agrees")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    digits = harvest(args.year, args.sources, args.every, args.workers)
+    print("Found {} unique digits in {} digit crops, in {:.0f} s".format(
+        len(digits), sum(count for _, _, count in digits.values()), time.perf_counter() - start))
+
+    start = time.perf_counter()
+    # Most often seen first, so that active sampling keeps the common forms of each digit
+    unique = sorted(digits.values(), key=lambda digit: -digit[2])
+    crops = [crop for _, crop, _ in unique]
+    labels = label(args.year, crops, args.workers, montage_ocr=args.montage)
+    if args.compare_montage:
+        tiled = label(args.year, crops, args.workers, montage_ocr=not args.montage)
+        agree = sum(a == b for a, b in zip(labels, tiled))
+        print("Labels read one digit per call and many per call agree for {} of {} digits ({:.1%})".format(
+            agree, len(crops), agree / max(len(crops), 1)))
+    rows = [np.hstack([[c], features]) for c, (features, _, _) in zip(labels, unique) if c is not None]
+    print("Labelled {} of them in {:.0f} s".format(len(rows), time.perf_counter() - start))
+
+    rows = np.float32(rows).reshape(-1, ROW_SIZE)
+    base = np.ndarray((0, ROW_SIZE), np.float32)
+    if args.append:
+        # The training data as readers load it, with the digits journaled since it was last compacted
+        base = load_classifier(TRAINING_DATA_FILE).model
+    if args.active:
+        rows = select_uncertain(base, rows, args.max_distance)
+        print("Kept {} digits the training data is unsure of or gets wrong".format(len(rows)))
+    model = np.vstack([base, rows])
+    save_pickle(args.output, model)
+    if args.append and os.path.abspath(args.output) == os.path.abspath(TRAINING_DATA_FILE) and \
+            os.path.exists(journal_path(TRAINING_DATA_FILE)):
+        # The journaled digits are in the training data now, as after compact_training_data
+        os.remove(journal_path(TRAINING_DATA_FILE))
+    print("Saved {} digits to {} and {}".format(len(model), args.output, convert_pickle(args.output)))
+
+
+if __name__ == '__main__':
+    main()
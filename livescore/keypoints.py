@@ -0,0 +1,47 @@
+import os
+
+import cv2
+import numpy as np
+
+from .features import create_detector
+from .registry import read_only, shared
+
+
+def keypoints_path(template_path, detector='orb'):
+    # Where the pruned keypoints of a template are saved, next to it, named after the detector unless it's ORB
+    suffix = '_keypoints.npz' if detector == 'orb' else '_{}_keypoints.npz'.format(detector)
+    return os.path.splitext(template_path)[0] + suffix
+
+
+def save_keypoints(path, template, keypoints, descriptors):
+    """saves template keypoints and their descriptors, along with the template shape they were computed for"""
+    points = np.float32([(k.pt[0], k.pt[1], k.size, k.angle, k.response, k.octave, k.class_id) for k in keypoints])
+    np.savez(path, keypoints=points.reshape(-1, 7), descriptors=descriptors, template_shape=template.shape)
+
+
+def load_keypoints(path, template):
+    """loads keypoints saved by save_keypoints, checking that they belong to a template of the same shape"""
+    with np.load(path) as data:
+        if tuple(data['template_shape']) != template.shape:
+            raise ValueError("Keypoints in {} are for a {} template, not {}".format(
+                path, tuple(data['template_shape']), template.shape))
+        keypoints = [cv2.KeyPoint(float(x), float(y), float(size), float(angle), float(response), int(octave),
+                                  int(class_id))
+                     for x, y, size, angle, response, octave, class_id in data['keypoints']]
+        return keypoints, data['descriptors']
+
+
+def template_keypoints(template_file, template_scale, detector, pruned_keypoints, load_template):
+    """returns the keypoints and descriptors of a template at the given template scale, or at full size the ones
+    prune_keypoints kept for it. They're built once, from the template load_template returns, and shared by every
+    reader with the same detector"""
+    def build():
+        template = load_template()
+        pruned_file = keypoints_path(template_file, detector)
+        if pruned_keypoints and template_scale == 1 and os.path.exists(pruned_file):
+            kp, des = load_keypoints(pruned_file, template)
+        else:
+            kp, des = create_detector(detector).detectAndCompute(template, None)
+        read_only(des)
+        return kp, des
+    return shared(('template_keypoints', template_file, template_scale, detector, bool(pruned_keypoints)), build)
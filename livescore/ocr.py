@@ -0,0 +1,41 @@
+import numpy as np
+from PIL import Image
+import pytesseract
+
+
+def montage(images, pad=16):
+    """stacks dark on light images into a single column, each left aligned in a cell as tall as the tallest plus pad
+    above and below, so that Tesseract reads each one as its own line. Returns the montage and the cell height"""
+    cell_height = max(img.shape[0] for img in images) + 2 * pad
+    width = max(img.shape[1] for img in images) + 2 * pad
+    tiled = np.full((cell_height * len(images), width), 255, np.uint8)
+    for i, img in enumerate(images):
+        top = i * cell_height + (cell_height - img.shape[0]) // 2
+        tiled[top:top + img.shape[0], pad:pad + img.shape[1]] = img
+    return tiled, cell_height
+
+
+def read_each(images, config, psm=8):
+    """reads every image with its own Tesseract call and the given page segmentation mode, returning the text found
+    in each"""
+    config = '--psm {} {}'.format(psm, config)
+    return [pytesseract.image_to_string(Image.fromarray(img), config=config).strip() for img in images]
+
+
+def read_cells(images, config, psm=8, pad=16):
+    """reads every image with a single Tesseract call on a montage of them, returning the text found in each cell, in
+    order. Words are assigned to the cell their centre falls in, so a cell Tesseract finds nothing in reads as ''.
+    A single image is read on its own with the given page segmentation mode instead"""
+    if not images:
+        return []
+    if len(images) == 1:
+        return read_each(images, config, psm)
+    config = '--psm 6 {}'.format(config)  # A block of lines, one per cell
+    tiled, cell_height = montage(images, pad)
+    data = pytesseract.image_to_data(Image.fromarray(tiled), config=config, output_type=pytesseract.Output.DICT)
+    words = [[] for _ in images]
+    for text, left, top, height in zip(data['text'], data['left'], data['top'], data['height']):
+        cell = (top + height // 2) // cell_height
+        if text.strip() and 0 <= cell < len(images):
+            words[cell].append((left, text.strip()))
+    return [' '.join(text for _, text in sorted(cell)) for cell in words]
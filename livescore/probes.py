@@ -0,0 +1,84 @@
+import cv2
+import numpy as np
+
+# How far a probe has to be from a predicate's threshold for the predicate to be fully confident
+SATURATION_MARGIN = 0.2
+HUE_MARGIN = 0.05
+COLOR_MARGIN = 32  # Levels between blue and red
+
+
+def sample_probes(img, points, radius=0):
+    """given an image and an (N, 2) array of x, y points, returns the (N, channels) float32 color at each point,
+    averaged over a (2 * radius + 1) square neighbourhood"""
+    points = np.asarray(np.round(points), dtype=np.int32).reshape(-1, 2)
+    channels = img.shape[2] if img.ndim == 3 else 1
+    offsets = np.arange(-radius, radius + 1, dtype=np.int32)
+    xs = np.clip(points[:, 0, None, None] + offsets[None, None, :], 0, img.shape[1] - 1)
+    ys = np.clip(points[:, 1, None, None] + offsets[None, :, None], 0, img.shape[0] - 1)
+    samples = img[ys, xs].astype(np.float32)  # shape: points, rows, cols, chans
+    return samples.reshape(len(points), -1, channels).mean(axis=1)
+
+
+def yuv_to_bgr(y, u, v):
+    """converts (N, 1) arrays of Y, U and V samples to (N, 3) float32 BGR colors, with the same conversion OpenCV
+    uses to decode NV12 and I420 frames"""
+    n = len(y)
+    # A 2 x 2N NV12 image holding each sample in its own 2x2 block
+    nv12 = np.empty((3, 2 * n), np.uint8)
+    nv12[:2] = np.repeat(np.round(y).astype(np.uint8).reshape(1, n), 2, axis=1)
+    nv12[2, 0::2] = np.round(u).reshape(n)
+    nv12[2, 1::2] = np.round(v).reshape(n)
+    return cv2.cvtColor(nv12, cv2.COLOR_YUV2BGR_NV12)[0, 0::2].astype(np.float32)
+
+
+def bgr_to_hsv(bgr):
+    """converts an (N, 3) array of BGR colors to HSV in a single call, using the same 0-1 ranges as colorsys"""
+    hsv = cv2.cvtColor(np.float32(bgr).reshape(1, -1, 3) / 255, cv2.COLOR_BGR2HSV).reshape(-1, 3)
+    hsv[:, 0] /= 360
+    return hsv
+
+
+class ProbeSamples(object):
+    """Colors sampled at every probe point of a frame, keyed by probe name. Each predicate records how confident it is
+    in confidence, by probe name"""
+    def __init__(self, index, points, bgr, hsv):
+        self.points = points
+        self.bgr = bgr
+        self.hsv = hsv
+        self.confidence = {}
+        self._index = index  # name -> slice of rows
+
+    def _record(self, name, margins, full_margin):
+        # From 0 to 1, how far the probe closest to the threshold is from it relative to full_margin
+        self.confidence[name] = float(min(1, np.abs(margins).min() / full_margin))
+
+    def getPoints(self, name):
+        return [tuple(p) for p in self.points[self._index[name]]]
+
+    def getBgr(self, name):
+        return self.bgr[self._index[name]]
+
+    def getHsv(self, name):
+        return self.hsv[self._index[name]]
+
+    def isSaturated(self, name, threshold):
+        saturation = self.getHsv(name)[:, 1]
+        self._record(name, saturation - threshold, SATURATION_MARGIN)
+        return saturation > threshold
+
+    def isHueInRange(self, name, low, high):
+        hue = self.getHsv(name)[:, 0]
+        self._record(name, np.minimum(hue - low, high - hue), HUE_MARGIN)
+        return (low < hue) & (hue < high)
+
+    def isBlue(self, name):
+        # More blue than red
+        bgr = self.getBgr(name)
+        self._record(name, bgr[:, 0] - bgr[:, 2], COLOR_MARGIN)
+        return bgr[:, 0] > bgr[:, 2]
+
+    def isRed(self, name):
+        # More red than blue
+        bgr = self.getBgr(name)
+        self._record(name, bgr[:, 0] - bgr[:, 2], COLOR_MARGIN)
+        return bgr[:, 0] < bgr[:, 2]
@@ -0,0 +1,109 @@
+import argparse
+import os
+import time
+
+import cv2
+import numpy as np
+import pkg_resources
+import yaml
+
+from .LivescoreAuto import READERS
+from .LivescoreBase import NoOverlayFoundException
+from .digits import DigitClassifier, convert_pickle, load_pickle, prune, save_pickle
+
+
+def load_corpus(corpus_dir):
+    # Frames of each year under images/YEAR with their expected details from data/YEAR.yml, as in the tests, and
+    # the features of every digit in them
+    frames = []
+    features = []
+    for year in sorted(READERS):
+        data_file = os.path.join(corpus_dir, 'data', '{}.yml'.format(year))
+        if not os.path.exists(data_file):
+            continue
+        with open(data_file) as f:
+            values = yaml.load(f, Loader=yaml.Loader) or {}
+        frc = READERS[year]()
+        for name, expected in values.items():
+            img = cv2.imread(os.path.join(corpus_dir, 'images', str(year), name))
+            if img is None:
+                continue
+            frames.append((frc, img, expected))
+            try:
+                frame = frc._splitFrame(img, 'bgr')
+                frc._findScoreOverlay(frame, True)
+            except NoOverlayFoundException:
+                continue
+            rois = frc._getRoisThresh(frame)
+            for roi in frc._ROIS:
+                features.extend(f for f, _, crop in frc._segmentDigits(rois.getImage(roi))
+                                if crop.shape[1] <= frc._OCR_HEIGHT)
+    return frames, np.vstack(features)
+
+
+def _details_lines(details):
+    # Match keys and names are read with Tesseract rather than the digit classifier, so they're left out
+    return [line for line in str(details).splitlines() if not line.startswith('Match')]
+
+
+def evaluate(corpus, model, repeat=20):
+    """reads every frame of the corpus with a classifier of the model rows, returning the mean time to classify a
+    digit in milliseconds and the fraction of frames whose details are read as expected"""
+    frames, features = corpus
+    digits = DigitClassifier(model)
+    correct = 0
+    for frc, img, expected in frames:
+        frc._digits = digits
+        try:
+            details = frc.read(img, force_find_overlay=True)
+        except NoOverlayFoundException:
+            details = None
+        correct += _details_lines(details) == _details_lines(expected)
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for f in features:
+            digits.findNearest(f, k=3)
+    return 1000 * (time.perf_counter() - start) / (repeat * len(features)), float(correct) / len(frames)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Drops near duplicate digits from the training data and balances "
+                                                 "its classes, reporting how fast and accurately digits are read "
+                                                 "before and after")
+    parser.add_argument('training_data', nargs='?',
+                        default=pkg_resources.resource_filename('livescore', 'training_data') + '/digits.pkl',
+                        help="Training data pickle, defaults to the one readers use")
+    parser.add_argument('--min-distance', type=float, default=50,
+                        help="Drop digits closer than this to one of the same class already kept")
+    parser.add_argument('--max-per-class', type=int, default=64,
+                        help="Drop near duplicates further apart in classes with more digits than this, 0 for no limit")
+    parser.add_argument('--corpus', default='tests', help="Directory with images/YEAR frames and data/YEAR.yml details")
+    output = parser.add_mutually_exclusive_group()
+    output.add_argument('--output', help="Training data pickle to save, defaults to one next to the training data "
+                                         "with -pruned added to its name, e.g. digits-pruned.pkl")
+    output.add_argument('--in-place', action='store_true',
+                        help="Overwrite the training data, discarding the digits pruned for good")
+    args = parser.parse_args()
+
+    model = load_pickle(args.training_data)
+    pruned = prune(model, args.min_distance, args.max_per_class)
+    corpus = load_corpus(args.corpus)
+    print("{} frames and {} digits in the corpus".format(len(corpus[0]), len(corpus[1])))
+    print("{:>8} {:>8} {:>24} {:>12} {:>9}".format('', 'digits', 'per class', 'ms / digit', 'accuracy'))
+    for name, rows in (('before', model), ('after', pruned)):
+        ms, accuracy = evaluate(corpus, rows)
+        counts = np.bincount(rows[:, 0].astype(np.intp), minlength=10)
+        print("{:>8} {:>8} {:>24} {:>12.3f} {:>9.0%}".format(name, len(rows), ' '.join(str(c) for c in counts), ms,
+                                                             accuracy))
+
+    if args.in_place:
+        output = args.training_data
+    else:
+        output = args.output or '{}-pruned{}'.format(*os.path.splitext(args.training_data))
+    save_pickle(output, pruned)
+    print("Saved {} digits to {} and {}".format(len(pruned), output, convert_pickle(output)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,141 @@
+import argparse
+import os
+import time
+
+import cv2
+import numpy as np
+
+from .LivescoreAuto import READERS
+from .LivescoreBase import NoOverlayFoundException
+from .features import DETECTORS
+from .keypoints import keypoints_path, save_keypoints
+
+
+def load_frames(frc, paths):
+    # Reads every image under the given files and directories at the size the reader searches them at
+    frames = []
+    for path in paths:
+        names = sorted(os.path.join(path, n) for n in os.listdir(path)) if os.path.isdir(path) else [path]
+        for name in names:
+            img = cv2.imread(name)
+            if img is not None:
+                frames.append(frc._splitFrame(img, 'bgr').copy())
+    return frames
+
+
+def find_transforms(frc, frames):
+    # The overlay transform the reader finds with every template keypoint, or None where it finds no overlay or what
+    # it finds fails the quick check
+    transforms = []
+    for img in frames:
+        try:
+            frc._findScoreOverlay(img, True)
+        except NoOverlayFoundException:
+            transforms.append(None)
+            continue
+        transforms.append(frc._transform if frc._isOverlayAt(img, frc._transform) else None)
+    return transforms
+
+
+def count_repeatable(frc, frames, transforms, tolerance=3):
+    """returns how many frames each template keypoint is matched in, within tolerance pixels of where the overlay
+    transform puts it"""
+    hits = np.zeros(len(frc._kp1), np.int32)
+    points = cv2.KeyPoint_convert(frc._kp1)
+    for img, transform in zip(frames, transforms):
+        if transform is None:
+            continue
+        kp2, des2 = frc._detector.detectAndCompute(img, None)
+        if des2 is None or len(des2) < 2:
+            continue
+        distances, indices = frc._matcher.knnSearch(frc._des1, des2, 2)
+        good = (indices[:, 1] >= 0) & (distances[:, 0] < 0.75 * distances[:, 1])
+        expected = points * transform['scale'] + (transform['tx'], transform['ty'])
+        error = np.hypot(*(cv2.KeyPoint_convert(kp2)[indices[:, 0]] - expected).T)
+        hits += good & (error < tolerance)
+    return hits
+
+
+def corner_error(frc, t, transform):
+    # Largest distance in pixels between the overlay corners a 2x3 transform gives and those of the reference
+    corners = np.float32([[0, 0], frc._template.shape[1::-1]])
+    found = corners.dot(t[:, :2].T) + t[:, 2]
+    expected = corners * transform['scale'] + (transform['tx'], transform['ty'])
+    return np.abs(found - expected).max()
+
+
+def evaluate(frc, frames, transforms, keypoints, descriptors, tolerance=2):
+    """searches every frame using the given template keypoints, returning the mean search time in milliseconds, the
+    fraction of frames with an overlay where its corners land within tolerance pixels of the reference, and the
+    number of frames without an overlay where one is found anyway"""
+    times = []
+    correct = 0
+    false_positives = 0
+    for img, transform in zip(frames, transforms):
+        start = time.perf_counter()
+        t, _ = frc._matchOverlay(img, frc._detector, frc._template, keypoints, descriptors)
+        times.append(time.perf_counter() - start)
+        if transform is None:
+            false_positives += t is not None
+        elif t is not None:
+            correct += corner_error(frc, t, transform) < tolerance
+    num_overlays = sum(t is not None for t in transforms)
+    return 1000 * np.mean(times), float(correct) / num_overlays, false_positives
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prunes a score overlay template to the keypoints that match a "
+                                                 "corpus of frames repeatably, for readers with pruned_keypoints=True")
+    parser.add_argument('year', type=int)
+    parser.add_argument('frames', nargs='+', help="Images, or directories of images, with and without the overlay")
+    parser.add_argument('--min-fraction', type=float,
+                        help="Keep keypoints matched in at least this fraction of the frames with an overlay. Defaults "
+                             "to the fewest keypoints, matched in up to half the frames, that are as accurate as "
+                             "the full set")
+    parser.add_argument('--detector', default='orb', choices=sorted(DETECTORS))
+    parser.add_argument('--output', help="Defaults to score_overlay_YEAR_keypoints.npz next to the template, with "
+                                         "the detector name before _keypoints for detectors other than ORB")
+    args = parser.parse_args()
+
+    frc = READERS[args.year](detector=args.detector)
+    frames = load_frames(frc, args.frames)
+    transforms = find_transforms(frc, frames)
+    num_overlays = sum(t is not None for t in transforms)
+    if num_overlays == 0:
+        parser.error("None of the {} frames have an overlay".format(len(frames)))
+    hits = count_repeatable(frc, frames, transforms)
+    print("{} of {} frames have an overlay, {} template keypoints".format(num_overlays, len(frames), len(hits)))
+
+    start = time.perf_counter()
+    for img in frames:
+        frc._detector.detectAndCompute(img, None)
+    print("Detecting frame keypoints takes {:.1f} ms of each search".format(
+        1000 * (time.perf_counter() - start) / len(frames)))
+
+    # Trade off of matching time against accuracy, from every keypoint down to those matched in every frame. Accuracy
+    # is measured on the same frames the keypoints were picked with, so hold some frames back to check a pruned set
+    print("{:>12} {:>10} {:>10} {:>9} {:>16}".format('min frames', 'keypoints', 'search ms', 'accuracy',
+                                                     'false positives'))
+    min_hits = 1
+    full_accuracy = None
+    for threshold in sorted(set([0, 1] + [int(np.ceil(f * num_overlays)) for f in (0.25, 0.5, 0.75, 1)])):
+        keep = np.flatnonzero(hits >= threshold)
+        ms, accuracy, false_positives = evaluate(frc, frames, transforms, [frc._kp1[i] for i in keep],
+                                                 frc._des1[keep])
+        print("{:>12} {:>10} {:>10.1f} {:>9.0%} {:>16}".format(threshold, len(keep), ms, accuracy, false_positives))
+        if full_accuracy is None:
+            full_accuracy = accuracy
+        elif accuracy >= full_accuracy and false_positives == 0 and threshold <= num_overlays / 2.0:
+            # Keypoints that matched in every frame of a small corpus are too few to rely on
+            min_hits = threshold
+
+    if args.min_fraction is not None:
+        min_hits = max(1, int(np.ceil(args.min_fraction * num_overlays)))
+    keep = np.flatnonzero(hits >= min_hits)
+    output = args.output or keypoints_path(frc._template_files[1], args.detector)
+    save_keypoints(output, frc._template, [frc._kp1[i] for i in keep], frc._des1[keep])
+    print("Saved {} keypoints matched in at least {} frames to {}".format(len(keep), min_hits, output))
+
+
+if __name__ == '__main__':
+    main()
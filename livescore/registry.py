@@ -0,0 +1,50 @@
+import atexit
+import threading
+import weakref
+
+# Immutable assets shared by every reader in the process, such as templates, their keypoints and the digit model
+_assets = {}
+_lock = threading.Lock()
+_key_locks = {}  # Key -> lock held while its asset is built
+
+
+def shared(key, build):
+    """returns the asset for a hashable key, calling build() to create it the first time it's asked for. The asset is
+    built once per process, even when several threads ask for it at the same time, so it must not be modified"""
+    try:
+        return _assets[key]
+    except KeyError:
+        pass
+    with _lock:
+        key_lock = _key_locks.setdefault(key, threading.Lock())
+    # Only readers waiting on the same asset wait for it to be built
+    with key_lock:
+        if key not in _assets:
+            _assets[key] = build()
+    return _assets[key]
+
+
+def clear():
+    """forgets every shared asset, so that the next reader loads them again, e.g. after template files change"""
+    with _lock:
+        _assets.clear()
+        _key_locks.clear()
+
+
+def call_at_exit(method):
+    """calls a bound method when the process exits, unless its object has been garbage collected by then. Unlike
+    registering the method with atexit, the object isn't kept alive until the process exits"""
+    ref = weakref.WeakMethod(method)
+
+    def call():
+        method = ref()
+        if method is not None:
+            method()
+    atexit.register(call)
+
+
+def read_only(*arrays):
+    # Makes arrays that are about to be shared read only, so a reader modifying one fails instead of corrupting others
+    for a in arrays:
+        if a is not None:
+            a.setflags(write=False)
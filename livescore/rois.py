@@ -0,0 +1,69 @@
+import cv2
+import numpy as np
+
+
+class RoiStrip(object):
+    """Packs every ROI of a frame side by side into a single strip image at OCR height, so that all of them can be
+    cropped and resized with one remap, thresholded with one inRange per color and opened with one erode and one
+    dilate. Each ROI is separated from its neighbours by a gap wide enough that the morphology of one never leaks
+    into another."""
+    def __init__(self, rects, height, kernel_shape=(3, 3)):
+        # rects is an ordered dict of name -> (tl, br, white) in image coordinates, white ROIs first
+        self._index = {}
+        self._corners = {}
+        gap = max(1, kernel_shape[1] // 2)
+        xs, ys = [], []
+        col = 0
+        self.white_end = 0
+        for name, (tl, br, white) in rects.items():
+            xmap, ymap = self._resizeMaps(tl, br, height)
+            self._index[name] = (slice(0, xmap.shape[0]), slice(col, col + xmap.shape[1]))
+            self._corners[name] = (tl, br)
+            xs.append((col, xmap))
+            ys.append((col, ymap))
+            col += xmap.shape[1]
+            if white:
+                self.white_end = col
+            col += gap
+
+        # Gap pixels map outside of the frame and are overwritten before each morphology step
+        xmap = np.full((height, col), -1, np.float32)
+        ymap = np.full((height, col), -1, np.float32)
+        self.gap = np.ones((height, col), bool)
+        for (c, x), (_, y) in zip(xs, ys):
+            xmap[:x.shape[0], c:c + x.shape[1]] = x
+            ymap[:y.shape[0], c:c + y.shape[1]] = y
+            self.gap[:x.shape[0], c:c + x.shape[1]] = False
+        self.map1, self.map2 = cv2.convertMaps(xmap, ymap, cv2.CV_16SC2)
+
+    @staticmethod
+    def _resizeMaps(tl, br, height):
+        # Source coordinates equivalent to cropping [tl, br) and resizing it to the given height with INTER_LINEAR
+        w = br[0] - tl[0]
+        h = br[1] - tl[1]
+        scale = float(height) / h
+        dst_w, dst_h = int(w * scale), int(h * scale)
+        x = (np.arange(dst_w, dtype=np.float32) + 0.5) * (float(w) / dst_w) - 0.5
+        y = (np.arange(dst_h, dtype=np.float32) + 0.5) * (float(h) / dst_h) - 0.5
+        x = np.clip(x, 0, w - 1) + tl[0]
+        y = np.clip(y, 0, h - 1) + tl[1]
+        return np.meshgrid(x, y)
+
+    def getCorners(self, name):
+        return self._corners[name]
+
+    def getImage(self, binary, name):
+        return binary[self._index[name]]
+
+
+class RoiImages(object):
+    """Binarized views into a thresholded strip, keyed by ROI name"""
+    def __init__(self, strip, binary):
+        self._strip = strip
+        self.binary = binary
+
+    def getCorners(self, name):
+        return self._strip.getCorners(name)
+
+    def getImage(self, name):
+        return self._strip.getImage(self.binary, name)
@@ -20,26 +20,25 @@ class SimpleFeatureExtractor(FeatureExtractor):
         self.feature_size = feature_size
         self.stretch = stretch
 
-    def extract(self, image, segments):
+    def extract(self, image, segments, out=None):
+        """out, if given, is a (len(segments), feature_size ** 2) array the features are written to"""
         # image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
         fs = self.feature_size
         bg = background_color(image)
 
-        regions = numpy.ndarray(shape=(0, fs), dtype=FEATURE_DATATYPE)
-        for segment in segments:
+        if out is None:
+            out = numpy.empty((len(segments), fs ** 2), dtype=FEATURE_DATATYPE)
+        for i, segment in enumerate(segments):
             region = region_from_segment(image, segment)
+            feature = out[i].reshape(fs, fs)
             if self.stretch:
-                region = cv2.resize(region, (fs, fs))
+                feature[:, :] = cv2.resize(region, (fs, fs))
             else:
                 x, y, w, h = segment
                 proportion = float(min(h, w)) / max(w, h)
                 new_size = (fs, int(fs * proportion)) if min(w, h) == h else (int(fs * proportion), fs)
                 region = cv2.resize(region, new_size)
                 s = region.shape
-                newregion = numpy.ndarray((fs, fs), dtype=region.dtype)
-                newregion[:, :] = bg
-                newregion[:s[0], :s[1]] = region
-                region = newregion
-            regions = numpy.append(regions, region, axis=0)
-        regions.shape = (len(segments), fs ** 2)
-        return regions
+                feature[:, :] = bg
+                feature[:s[0], :s[1]] = region
+        return out
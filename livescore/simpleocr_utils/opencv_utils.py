@@ -82,7 +82,11 @@ def ask_for_key(return_arrow_keys=True):
 
 
 def background_color(image, numpy_result=True):
-    result = numpy.median(numpy.median(image, 0), 0).astype(int)
+    if image.ndim == 2 and 2 * numpy.count_nonzero(2 * numpy.count_nonzero(image, 0) < image.shape[0]) > image.shape[1]:
+        # Most columns are mostly zero, so the median of the column medians is zero too, without sorting them
+        result = numpy.int64(0)
+    else:
+        result = numpy.median(numpy.median(image, 0), 0).astype(int)
     if not numpy_result:
         try:
             result = tuple(map(int, result))
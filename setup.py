@@ -15,7 +15,7 @@ setup(
     license='MIT',
     # package_dir={"": "livescore"},
     packages=find_packages(exclude=('tests', 'docs')),
-    package_data={'livescore': ['templates/*.png', 'tessdata/*.traineddata', 'training_data/*.pkl']},
+    package_data={'livescore': ['templates/*.png', 'templates/*.npz', 'tessdata/*.traineddata', 'training_data/*.pkl']},
     install_requires=[
         'pytesseract==0.3.9',
         'numpy>=1.14.0', #1.22.3
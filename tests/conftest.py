@@ -0,0 +1,16 @@
+import shutil
+
+import pytest
+
+from livescore import LivescoreBase
+
+
+@pytest.fixture(scope='session', autouse=True)
+def training_data(tmp_path_factory):
+    # Readers convert the digit model next to the training data they load, so they load a copy of it, leaving
+    # nothing behind in the package
+    path = str(tmp_path_factory.mktemp('training_data') / 'digits.pkl')
+    shutil.copy(LivescoreBase.TRAINING_DATA_FILE, path)
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(LivescoreBase, 'TRAINING_DATA_FILE', path)
+        yield path
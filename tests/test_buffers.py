@@ -0,0 +1,24 @@
+import tracemalloc
+
+import cv2
+
+from livescore import Livescore2022
+
+
+def test_steady_state_read_allocations():
+    frc = Livescore2022()
+    # Known overlay position, so every read takes the quick check path instead of a full search
+    frc._transform = {'scale': 1.0, 'tx': 0.0, 'ty': 553.0}
+    frc._match_key = 'qm61'
+    img = cv2.imread('images/2022/frame1856.png')  # 1080p, so read() has to resize
+    for _ in range(3):
+        assert frc.read(img) is not None
+
+    tracemalloc.start()
+    for _ in range(10):
+        frc.read(img)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    # A single 720p frame is 2.7MB
+    assert peak < 256 * 1024
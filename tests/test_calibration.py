@@ -0,0 +1,43 @@
+import json
+
+import cv2
+import pytest
+
+from livescore import Livescore2019, Livescore2022
+
+
+def find_without_search(frc, img):
+    def no_search(*args):
+        raise AssertionError("Searched for the overlay")
+    frc._matchOverlay = no_search
+    frc._findScoreOverlay(frc._splitFrame(img, 'bgr'), False)
+    return frc._transform
+
+
+def test_calibration_round_trip():
+    img = cv2.imread('images/2022/frame1856.png')
+    frc = Livescore2022()
+    assert frc.getCalibration() is None
+    frc._transform = {'scale': 1.0, 'tx': 0.0, 'ty': 553.0}
+    frc._findScoreOverlay(frc._splitFrame(img, 'bgr'), False)
+    calibration = json.loads(json.dumps(frc.getCalibration()))
+    assert calibration == {'game_year': 2022, 'frame_size': [1280, 720],
+                           'transform': {'scale': 1.0, 'tx': 0.0, 'ty': 553.0}}
+
+    assert find_without_search(Livescore2022(calibration=calibration), img) == calibration['transform']
+    # The same profile works when reading 1080p frames with the 1.5x template
+    native = find_without_search(Livescore2022(calibration=calibration, native_resolution=True), img)
+    assert native == {'scale': 1.0, 'tx': 0.0, 'ty': 553.0 * 1.5}
+
+
+def test_overlay_rectangle_calibration():
+    img = cv2.imread('images/2022/frame1856.png')
+    frc = Livescore2022(calibration={'frame_size': [1920, 1080], 'overlay': [0, 829, 1920, 251]})
+    transform = find_without_search(frc, img)
+    assert transform['scale'] == pytest.approx(1)
+    assert transform['ty'] == pytest.approx(552.67, abs=0.01)
+
+
+def test_calibration_for_another_year():
+    with pytest.raises(ValueError):
+        Livescore2019(calibration={'game_year': 2022, 'frame_size': [1280, 720], 'overlay': [0, 553, 1280, 167]})
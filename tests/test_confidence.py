@@ -0,0 +1,53 @@
+import cv2
+import numpy as np
+import pkg_resources
+
+from livescore import Livescore2022
+from livescore.digits import DigitClassifier, load_pickle
+from livescore.probes import ProbeSamples, bgr_to_hsv
+
+TRAINING_DATA = pkg_resources.resource_filename('livescore', 'training_data') + '/digits.pkl'
+
+
+def test_probe_confidence():
+    bgr = np.float32([[200, 40, 40], [120, 110, 100], [30, 40, 230]])
+    probes = ProbeSamples({'strong': slice(0, 1), 'weak': slice(1, 2), 'red': slice(2, 3)}, None, bgr,
+                          bgr_to_hsv(bgr))
+    assert probes.isSaturated('strong', 0.2)[0]
+    assert not probes.isSaturated('weak', 0.2)[0]
+    assert probes.confidence['strong'] == 1
+    assert 0 < probes.confidence['weak'] < 0.5
+    assert probes.isRed('red')[0] and probes.confidence['red'] == 1
+
+
+def test_digit_confidence():
+    model = load_pickle(TRAINING_DATA)
+    digits = DigitClassifier(model)
+    classes, confidences = digits.findNearestConfidence(model[:50, 1:], k=3)
+    assert np.array_equal(classes, digits.findNearest(model[:50, 1:], k=3))
+    assert ((0 <= confidences) & (confidences <= 1)).all()
+    assert confidences.max() == 1
+    # Far from every training digit
+    assert digits.findNearestConfidence(np.full(100, 128, np.float32), k=3)[1][0] < 0.5
+
+
+def test_reuse_confident_reads():
+    frames = [cv2.imread('images/2022/frame1856.png'), cv2.imread('images/2022/frame1991.png')]
+    frc = Livescore2022()
+    reuse = Livescore2022(reuse_confident=True)
+    parsed = []
+    parse = reuse._parseDigits
+    reuse._parseDigits = lambda img: parsed.append(img) or parse(img)
+    for reader in (frc, reuse):
+        reader._transform = {'scale': 1.0, 'tx': 0.0, 'ty': 553.0}
+        reader._match_key = 'qm61'
+
+    for img in frames + frames[-1:]:
+        parsed.clear()
+        details = reuse.read(img)
+        expected = frc.read(img)
+        assert str(details) == str(expected)
+        assert details.confidence == expected.confidence
+        assert set(details.confidence) >= {'time', 'left_score', 'right_score', 'color'}
+    # Nothing changed in the last frame, so every confident ROI was reused
+    assert len(parsed) == sum(c < 0.9 for name, c in details.confidence.items() if name in reuse._ROIS)
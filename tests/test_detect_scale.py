@@ -0,0 +1,19 @@
+import cv2
+import pytest
+
+from livescore import Livescore2019, Livescore2022
+
+
+@pytest.mark.parametrize('livescore_class, name', [
+    (Livescore2019, 'images/2019/01.png'),
+    (Livescore2022, 'images/2022/frame1991.png'),
+])
+def test_downscaled_search_matches_full_resolution(livescore_class, name):
+    img = cv2.resize(cv2.imread(name), (1280, 720))
+    full = livescore_class()
+    full._findScoreOverlay(img, True)
+    downscaled = livescore_class(detect_scale=0.5)
+    downscaled._findScoreOverlay(img, True)
+    assert downscaled._transform['scale'] == pytest.approx(full._transform['scale'], rel=0.005)
+    assert downscaled._transform['tx'] == pytest.approx(full._transform['tx'], abs=1)
+    assert downscaled._transform['ty'] == pytest.approx(full._transform['ty'], abs=1)
@@ -0,0 +1,29 @@
+import cv2
+import numpy as np
+import pytest
+
+from livescore import Livescore2022
+from livescore.features import TiledDetector
+
+
+def test_tiled_keypoints():
+    img = cv2.resize(cv2.imread('images/2022/frame1856.png'), (1280, 720))
+    kp, des = TiledDetector('orb', (2, 2)).detectAndCompute(img, None)
+    assert len(kp) == len(des)
+    # Keypoints in the overlap of two tiles are only kept by one of them
+    assert len(set((k.pt, k.size, k.angle, k.octave) for k in kp)) == len(kp)
+    points = np.float32([k.pt for k in kp])
+    assert (points >= 0).all() and (points < (1280, 720)).all()
+
+
+def test_tiled_search():
+    img = cv2.imread('images/2022/frame1856.png')
+    frc = Livescore2022(detect_tiles=(2, 2))
+    frc._findScoreOverlay(frc._splitFrame(img, 'bgr'), True)
+    assert frc._transform['scale'] == pytest.approx(1, abs=0.01)
+    assert frc._transform['tx'] == pytest.approx(0, abs=1)
+    assert frc._transform['ty'] == pytest.approx(553, abs=1)
+
+
+def test_tiled_detectors_share_threads():
+    assert TiledDetector('orb', (2, 2))._pool is TiledDetector('akaze', (3, 1))._pool
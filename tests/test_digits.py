@@ -0,0 +1,187 @@
+import gc
+import os
+import shutil
+import weakref
+
+import cv2
+import numpy as np
+import pkg_resources
+
+from livescore import Livescore2022, LivescoreBase
+from livescore.digits import (BinaryDigitClassifier, DigitClassifier, TrainingJournal, compact, journal_path,
+                              load_classifier, load_model, load_pickle, model_path, pack_features, pack_model, prune,
+                              segment_digits)
+from livescore.simpleocr_utils.feature_extraction import SimpleFeatureExtractor
+
+TRAINING_DATA = pkg_resources.resource_filename('livescore', 'training_data') + '/digits.pkl'
+
+
+def test_model_conversion(tmp_path):
+    pickle_path = str(tmp_path / 'digits.pkl')
+    shutil.copy(TRAINING_DATA, pickle_path)
+
+    model = load_model(pickle_path)
+    assert isinstance(model, np.memmap)
+    assert os.path.exists(model_path(pickle_path))
+    assert np.array_equal(model, load_pickle(pickle_path))
+
+    # A pickle newer than the model is converted again
+    os.utime(model_path(pickle_path), (0, 0))
+    load_model(pickle_path)
+    assert os.path.getmtime(model_path(pickle_path)) >= os.path.getmtime(pickle_path)
+
+
+def test_classifier_matches_knearest(tmp_path):
+    pickle_path = str(tmp_path / 'digits.pkl')
+    shutil.copy(TRAINING_DATA, pickle_path)
+    model = load_pickle(pickle_path)
+    knn = cv2.ml.KNearest_create()
+    knn.train(model[:, 1:], cv2.ml.ROW_SAMPLE, model[:, :1])
+    digits = DigitClassifier(load_model(pickle_path))
+
+    rng = np.random.RandomState(0)
+    features = np.vstack([
+        model[:, 1:],
+        np.clip(model[:, 1:] + rng.randint(-80, 80, model[:, 1:].shape), 0, 255),
+    ]).astype(np.float32)
+    for k in [1, 3]:
+        assert np.array_equal(digits.findNearest(features, k=k), knn.findNearest(features, k=k)[1].ravel())
+
+
+def test_training_journal(tmp_path):
+    pickle_path = str(tmp_path / 'digits.pkl')
+    shutil.copy(TRAINING_DATA, pickle_path)
+    model = load_pickle(pickle_path)
+    learned = model[:100].copy()
+    learned[:, 0] = (learned[:, 0] + 1) % 10
+
+    journal = TrainingJournal(journal_path(pickle_path), batch_size=64)
+    for row in learned:
+        journal.append(row[0], row[1:])
+    assert os.path.getsize(journal_path(pickle_path)) == 64 * 101 * 4
+    journal.flush()
+    # A row cut short is ignored
+    with open(journal_path(pickle_path), 'ab') as f:
+        f.write(b'\0' * 8)
+
+    # Journaled digits are trained incrementally on top of the model, and compacted into it
+    classifier = load_classifier(pickle_path)
+    assert np.array_equal(classifier.model, np.vstack([model, learned]))
+    assert compact(pickle_path) == 100
+    assert not os.path.exists(journal_path(pickle_path))
+    assert np.array_equal(load_model(pickle_path), classifier.model)
+    assert np.array_equal(load_classifier(pickle_path).findNearest(learned[:, 1:], k=1),
+                          classifier.findNearest(learned[:, 1:], k=1))
+
+    # Starting from scratch discards the training data
+    journal = TrainingJournal(journal_path(pickle_path), reset=True)
+    journal.append(learned[0, 0], learned[0, 1:])
+    journal.flush()
+    assert np.array_equal(load_classifier(pickle_path).model, learned[:1])
+    assert compact(pickle_path) == 1
+    assert np.array_equal(load_pickle(pickle_path), learned[:1])
+
+
+def test_discarded_journal_and_reader_flush(tmp_path):
+    # Neither is kept alive until the process exits, and their pending digits are journaled when they're discarded
+    model = load_pickle(TRAINING_DATA)
+    path = str(tmp_path / 'digits.journal')
+    journal = TrainingJournal(path)
+    journal.append(model[0, 0], model[0, 1:])
+    ref = weakref.ref(journal)
+    del journal
+    gc.collect()
+    assert ref() is None
+    assert os.path.getsize(path) == 101 * 4
+
+    path = journal_path(LivescoreBase.TRAINING_DATA_FILE)
+    size = os.path.getsize(path) if os.path.exists(path) else 0
+    frc = Livescore2022(save_training_data=True)
+    frc._labelDigits = lambda crops: [7] * len(crops)  # Without Tesseract
+    frc._pending_digits.append((model[:1, 1:], np.zeros((40, 20), np.uint8)))
+    ref = weakref.ref(frc)
+    del frc
+    gc.collect()
+    assert ref() is None
+    assert os.path.getsize(path) == size + 101 * 4
+
+
+def test_prune():
+    model = load_pickle(TRAINING_DATA)
+    pruned = prune(model, min_distance=50, max_per_class=64)
+    counts = np.bincount(pruned[:, 0].astype(int))
+    assert 0 < counts.min() and counts.max() <= 64
+
+    # Rows keep their training order, and exact duplicates are gone
+    rows = [tuple(r) for r in model]
+    kept = [rows.index(tuple(r)) for r in pruned]
+    assert kept == sorted(kept)
+    assert len(np.unique(pruned, axis=0)) == len(pruned)
+
+    # Without a limit, every dropped row has a kept row of its class within the distance
+    pruned = prune(model, min_distance=50, max_per_class=0)
+    for digit_class in range(10):
+        kept = pruned[pruned[:, 0] == digit_class, 1:]
+        dropped = model[model[:, 0] == digit_class, 1:]
+        dist = np.sqrt(np.square(dropped[:, None] - kept[None]).sum(axis=2)).min(axis=1)
+        assert dist.max() < 50
+
+
+def test_uncertain_digits():
+    model = load_pickle(TRAINING_DATA)
+    digits = DigitClassifier(model)
+    assert DigitClassifier(model[:0]).isUncertain(model[0, 1:], model[0, 0])
+
+    classes, distances = digits.findNeighbours(model[:, 1:], k=3)
+    confident = np.flatnonzero((classes == model[:, :1]).all(axis=1) & (distances[:, 0] == 0))
+    assert len(confident)
+    i = confident[0]
+    assert not digits.isUncertain(model[i, 1:], model[i, 0])
+    # Misclassified, or unlike any training digit
+    assert digits.isUncertain(model[i, 1:], (model[i, 0] + 1) % 10)
+    assert digits.isUncertain(np.full(100, 128, np.float32), model[i, 0], max_distance=0)
+
+
+def test_binary_digits(tmp_path):
+    pickle_path = str(tmp_path / 'digits.pkl')
+    shutil.copy(TRAINING_DATA, pickle_path)
+    model = load_pickle(pickle_path)
+
+    packed = load_model(pickle_path, binary=True)
+    assert os.path.exists(model_path(pickle_path, binary=True))
+    assert packed.dtype == np.uint8 and packed.shape == (len(model), 14)
+    assert np.array_equal(packed, pack_model(model))
+    assert np.array_equal(np.unpackbits(pack_features(model[:, 1:]), axis=1)[:, :100], model[:, 1:] > 127)
+
+    # Hamming distance between thresholded features mostly agrees with Euclidean distance
+    digits = load_classifier(pickle_path, binary=True)
+    assert isinstance(digits, BinaryDigitClassifier)
+    queries = model[::7, 1:]
+    agree = digits.findNearest(queries, k=3) == DigitClassifier(model).findNearest(queries, k=3)
+    assert agree.mean() > 0.95
+
+    classes, distances = digits.findNeighbours(queries[:1], k=3)
+    assert classes.shape == distances.shape == (1, 3)
+    assert distances[0, 0] == 0 and (np.diff(distances[0]) >= 0).all()
+
+    empty = BinaryDigitClassifier(pack_model(model[:0]))
+    assert empty.findNeighbours(queries[:1], k=3)[0].shape == (1, 0)
+    empty.train(model[:2])
+    assert np.array_equal(empty.model, packed[:2])
+
+
+def test_segment_digits():
+    img = np.zeros((40, 100), np.uint8)
+    cv2.rectangle(img, (60, 10), (75, 29), 255, -1)  # Digits out of order
+    cv2.rectangle(img, (20, 5), (35, 29), 255, -1)
+    img[35:37, 90:92] = 255  # Noise, left out of both the height and the digits
+    extractor = SimpleFeatureExtractor(feature_size=10, stretch=False)
+    features, boxes, scaled = segment_digits(img, 64, extractor)
+    assert scaled.shape[0] == 64
+    assert features.shape == (2, 100)
+    assert boxes[0, 0] < boxes[1, 0]
+    assert boxes[0, 3] == 64
+    assert np.array_equal(features[1], extractor.extract(scaled, boxes[1:])[0])
+
+    features, boxes, _ = segment_digits(np.zeros((40, 100), np.uint8), 64, extractor)
+    assert features.shape == (0, 100) and boxes.shape == (0, 4)
@@ -0,0 +1,53 @@
+import cv2
+import numpy as np
+import pytest
+
+from livescore import Livescore2019
+from livescore.benchmark_features import benchmark, load_corpus
+from livescore.features import DETECTORS, MATCHERS, KnnMatcher
+
+
+@pytest.mark.parametrize('detector', sorted(DETECTORS))
+@pytest.mark.parametrize('matcher', MATCHERS)
+def test_backend_finds_overlay(detector, matcher):
+    frc = Livescore2019(detector=detector, matcher=matcher)
+    img = frc._splitFrame(cv2.imread('images/2019/02.png'), 'bgr')
+    t, num_good = frc._matchOverlay(img, frc._detector, frc._template, frc._kp1, frc._des1)
+    assert num_good >= frc._MIN_MATCH_COUNT
+    assert t[0, 0] == pytest.approx(1, abs=0.01)
+    assert t[1, 2] == pytest.approx(550, abs=2)
+
+
+def test_knn_search():
+    rng = np.random.RandomState(0)
+    query = rng.randint(0, 256, (50, 32)).astype(np.uint8)
+    train = rng.randint(0, 256, (3, 32)).astype(np.uint8)
+    distances, indices = KnnMatcher('bf').knnSearch(query, train, 5)
+    assert distances.shape == indices.shape == (50, 5)
+    for q, d, i in zip(query, distances, indices):
+        expected = [cv2.norm(q, t, cv2.NORM_HAMMING) for t in train]
+        assert list(i[:3]) == list(np.argsort(expected, kind='stable'))
+        assert list(d[:3]) == sorted(expected)
+    # Only three neighbours exist
+    assert (indices[:, 3:] == -1).all() and np.isinf(distances[:, 3:]).all()
+
+    distances, indices = KnnMatcher('flann').knnSearch(query, train, 2)
+    found = indices >= 0
+    assert np.isinf(distances[~found]).all()
+    assert np.isfinite(distances[found]).all()
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        Livescore2019(detector='surf')
+    with pytest.raises(ValueError):
+        Livescore2019(matcher='kdtree')
+
+
+def test_benchmark():
+    corpus = load_corpus('images')
+    corpus = {2019: corpus[2019]}
+    result = benchmark(corpus, 'orb', 'bf')
+    assert result['accuracy'] == 1
+    assert result['false_positives'] == 0
+    assert result['error'] < 1
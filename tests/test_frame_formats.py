@@ -0,0 +1,63 @@
+import cv2
+import numpy as np
+import pytest
+import yaml
+
+import livescore
+from livescore import Livescore2022
+
+YEARS = [2017, 2018, 2019, 2020, 2022]
+
+
+def to_frame_format(img, frame_format):
+    if frame_format == 'gray':
+        return cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+    i420 = cv2.cvtColor(img, cv2.COLOR_BGR2YUV_I420)
+    if frame_format == 'i420':
+        return i420
+    h, w = img.shape[:2]
+    chroma = i420[h:].reshape(2, h // 2, w // 2)
+    return np.vstack([i420[:h], np.dstack(chroma).reshape(h // 2, w)])
+
+
+def corpus(year):
+    # Test images of a year, cropped to even sizes for the chroma planes of YUV frames
+    with open('data/{}.yml'.format(year)) as data:
+        names = yaml.load(data, Loader=yaml.Loader)
+    for name in names:
+        img = cv2.imread('images/{}/{}'.format(year, name))
+        if img is not None:
+            yield name, img[:img.shape[0] // 2 * 2, :img.shape[1] // 2 * 2]
+
+
+def corpus_reader(year):
+    frc = getattr(livescore, 'Livescore{}'.format(year))()
+    frc._parseRawMatchName = lambda img: 'Qualification 1 of 2'  # Without Tesseract
+    return frc
+
+
+@pytest.mark.parametrize('year', YEARS)
+@pytest.mark.parametrize('frame_format', ['nv12', 'i420'])
+def test_yuv_frames_read_like_bgr(year, frame_format):
+    frc = corpus_reader(year)
+    for name, img in corpus(year):
+        expected = str(frc.read(img, force_find_overlay=True))
+        assert str(frc.read(to_frame_format(img, frame_format), frame_format=frame_format)) == expected, name
+
+
+@pytest.mark.parametrize('year', YEARS)
+def test_gray_frames_read_digits_like_bgr(year):
+    frc = corpus_reader(year)
+    for name, img in corpus(year):
+        expected = frc.read(img, force_find_overlay=True)
+        data = frc.read(to_frame_format(img, 'gray'), frame_format='gray')
+        # Without color the alliance sides can't be told apart
+        assert sorted([data.red.score, data.blue.score]) == sorted([expected.red.score, expected.blue.score]), name
+        # A match under review is only told apart by its yellow banner, which reads as a time without color
+        if (year, name) != (2018, '13.png'):
+            assert data.time == expected.time, name
+
+
+def test_unknown_frame_format():
+    with pytest.raises(ValueError):
+        Livescore2022().read(np.zeros((720, 1280, 3), np.uint8), frame_format='rgb')
@@ -0,0 +1,59 @@
+import os
+import shutil
+import sys
+
+import numpy as np
+import pkg_resources
+
+from livescore import harvest_digits
+from livescore.digits import TrainingJournal, journal_path, load_pickle
+from livescore.harvest_digits import dedupe_key, harvest, select_uncertain, split_sources
+
+
+def test_split_sources():
+    tasks = split_sources(['images/2022', 'images/2019/01.png'], frames_per_task=5)
+    assert [len(t) for t in tasks] == [5, 3]
+
+
+def test_harvest_dedupes_digits():
+    digits = harvest(2022, ['images/2022'], workers=1)
+    counts = [count for _, _, count in digits.values()]
+    assert 0 < len(digits) < sum(counts)
+    for key, (features, crop, _) in digits.items():
+        assert features.shape == (100,)
+        assert crop.shape[0] <= 64 and crop.shape[1] <= 64
+        assert dedupe_key(features) == key
+
+
+def test_select_uncertain():
+    model = load_pickle(pkg_resources.resource_filename('livescore', 'training_data') + '/digits.pkl')
+    selected = select_uncertain(model[:0], model)
+    assert np.array_equal(selected[0], model[0])
+    assert len(selected) < len(model) / 2
+    # Digits the classifier was trained with are mostly left out
+    assert len(select_uncertain(model, model)) < len(selected)
+
+
+def test_append_includes_journaled_digits(tmp_path, monkeypatch):
+    pickle_path = str(tmp_path / 'digits.pkl')
+    shutil.copy(pkg_resources.resource_filename('livescore', 'training_data') + '/digits.pkl', pickle_path)
+    model = load_pickle(pickle_path)
+    journal = TrainingJournal(journal_path(pickle_path))
+    for row in model[:3]:
+        journal.append(row[0], row[1:])
+    journal.flush()
+
+    digit = model[3].copy()
+    monkeypatch.setattr(harvest_digits, 'TRAINING_DATA_FILE', pickle_path)
+    monkeypatch.setattr(harvest_digits, 'harvest', lambda *args: {0: (digit[1:], None, 1)})
+    monkeypatch.setattr(harvest_digits, 'label', lambda year, crops, *args, **kwargs: [digit[0]] * len(crops))
+    output = str(tmp_path / 'harvested.pkl')
+    monkeypatch.setattr(sys, 'argv', ['harvest_digits', '2022', 'videos', '--append', '--output', output])
+    harvest_digits.main()
+    assert np.array_equal(load_pickle(output), np.vstack([model, model[:3], digit]))
+
+    # Saved over the training data, the journal is merged into it
+    monkeypatch.setattr(sys, 'argv', ['harvest_digits', '2022', 'videos', '--append', '--output', pickle_path])
+    harvest_digits.main()
+    assert np.array_equal(load_pickle(pickle_path), np.vstack([model, model[:3], digit]))
+    assert not os.path.exists(journal_path(pickle_path))
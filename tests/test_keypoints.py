@@ -0,0 +1,37 @@
+import cv2
+import numpy as np
+import pytest
+
+from livescore import Livescore2019
+from livescore.keypoints import load_keypoints, save_keypoints
+from livescore.prune_keypoints import count_repeatable, evaluate, find_transforms, load_frames
+
+
+@pytest.fixture(scope='module')
+def frc():
+    return Livescore2019()
+
+
+def test_keypoints_round_trip(frc, tmp_path):
+    path = str(tmp_path / 'keypoints.npz')
+    save_keypoints(path, frc._template, frc._kp1, frc._des1)
+    keypoints, descriptors = load_keypoints(path, frc._template)
+    assert np.array_equal(descriptors, frc._des1)
+    assert [(k.pt, k.size, k.angle, k.octave) for k in keypoints] == \
+        [(k.pt, k.size, k.angle, k.octave) for k in frc._kp1]
+
+    with pytest.raises(ValueError):
+        load_keypoints(path, cv2.resize(frc._template, (640, 85)))
+
+
+def test_pruned_keypoints_find_overlay(frc):
+    frames = load_frames(frc, ['images/2019', 'images/2022/frame2040.png'])
+    transforms = find_transforms(frc, frames)
+    assert [t is None for t in transforms] == [False, False, False, True]
+
+    hits = count_repeatable(frc, frames, transforms)
+    keep = np.flatnonzero(hits >= 2)
+    assert 0 < len(keep) < len(frc._kp1)
+    _, accuracy, false_positives = evaluate(frc, frames, transforms, [frc._kp1[i] for i in keep], frc._des1[keep])
+    assert accuracy == 1
+    assert false_positives == 0
@@ -0,0 +1,29 @@
+import cv2
+import pytest
+
+from livescore import LivescoreAuto, NoOverlayFoundException
+
+
+@pytest.fixture(scope='module')
+def auto():
+    return LivescoreAuto()
+
+
+@pytest.mark.parametrize('name, year, ty', [
+    ('images/2017/01.png', 2017, 550),
+    ('images/2018/12.png', 2018, 0),
+    ('images/2019/02.png', 2019, 550),
+    ('images/2020/frame0025-teleop.jpg', 2020, 552),
+    ('images/2022/frame1991.png', 2022, 553),
+])
+def test_detect_year(auto, name, year, ty):
+    detected, transform = auto.detectYear(cv2.imread(name))
+    assert detected == year
+    assert transform['scale'] == pytest.approx(1, abs=0.01)
+    assert transform['tx'] == pytest.approx(0, abs=1)
+    assert transform['ty'] == pytest.approx(ty, abs=1)
+
+
+def test_frame_without_overlay(auto):
+    with pytest.raises(NoOverlayFoundException):
+        auto.detectYear(cv2.imread('images/2022/frame2040.png'))
@@ -0,0 +1,35 @@
+import cv2
+import numpy as np
+import pytest
+
+from livescore import Livescore2019, Livescore2022
+
+
+def split_screen(left, right):
+    # Two 720p frames side by side at half size, letterboxed into a 720p frame
+    frame = np.zeros((720, 1280, 3), np.uint8)
+    frame[180:540, :640] = cv2.resize(cv2.resize(left, (1280, 720)), (640, 360), interpolation=cv2.INTER_AREA)
+    frame[180:540, 640:] = cv2.resize(cv2.resize(right, (1280, 720)), (640, 360), interpolation=cv2.INTER_AREA)
+    return frame
+
+
+@pytest.mark.parametrize('frc, left, right, ty', [
+    (Livescore2019, 'images/2019/01.png', 'images/2019/02.png', 180 + 550 / 2),
+    (Livescore2022, 'images/2022/frame1856.png', 'images/2022/frame1991.png', 180 + 553 / 2),
+])
+def test_split_screen_overlays(frc, left, right, ty):
+    frc = frc()
+    img = split_screen(cv2.imread(left), cv2.imread(right))
+    transforms = sorted(frc._findScoreOverlays(img), key=lambda t: t['tx'])
+    assert len(transforms) == 2
+    for transform, tx in zip(transforms, (0, 640)):
+        assert transform['scale'] == pytest.approx(0.5, abs=0.01)
+        assert transform['tx'] == pytest.approx(tx, abs=3)
+        assert transform['ty'] == pytest.approx(ty, abs=3)
+
+
+def test_single_overlay():
+    img = cv2.resize(cv2.imread('images/2022/frame1856.png'), (1280, 720))
+    transforms = Livescore2022()._findScoreOverlays(img)
+    assert len(transforms) == 1
+    assert transforms[0]['ty'] == pytest.approx(553, abs=1)
@@ -0,0 +1,31 @@
+import cv2
+
+from livescore import Livescore2019, Livescore2022
+
+
+def test_closest_template_is_selected():
+    frc = Livescore2022(native_resolution=True)
+    img = cv2.imread('images/2022/frame1856.png')
+    frc._splitFrame(img, 'bgr')
+    assert frc._template_res == 1.5
+    frc._splitFrame(cv2.resize(img, (1280, 720)), 'bgr')
+    assert frc._template_res == 1
+
+    # Years without a high resolution template fall back to the 720p one
+    frc = Livescore2019(native_resolution=True)
+    frc._splitFrame(cv2.resize(img, (1920, 1080)), 'bgr')
+    assert frc._template_res == 1
+
+
+def test_native_read_matches_720p():
+    frc = Livescore2022()
+    frc._transform = {'scale': 1.0, 'tx': 0.0, 'ty': 553.0}
+    frc._match_key = 'qm61'
+    native = Livescore2022(native_resolution=True)
+    for name in ['frame1856.png', 'frame1991.png', 'frame1992.png']:
+        img = cv2.imread('images/2022/{}'.format(name))
+        native._splitFrame(img, 'bgr')
+        # Same overlay location, relative to the 1.5x template in the 1080p frame
+        native._transform = {'scale': 1.0, 'tx': 0.0, 'ty': 553.0 * 1.5}
+        native._match_key = 'qm61'
+        assert str(native.read(img)) == str(frc.read(img))
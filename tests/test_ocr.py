@@ -0,0 +1,59 @@
+import numpy as np
+import pytesseract
+
+from livescore import Livescore2022
+from livescore.ocr import montage, read_cells, read_each
+
+
+def test_montage_cells():
+    images = [np.zeros((10, 4), np.uint8), np.zeros((20, 8), np.uint8)]
+    tiled, cell_height = montage(images, pad=2)
+    assert cell_height == 24
+    assert tiled.shape == (48, 12)
+    # Each image is centred in its own cell, on a light background
+    assert (tiled[7:17, 2:6] == 0).all() and (tiled[:7] == 255).all()
+    assert (tiled[26:46, 2:10] == 0).all() and (tiled[46:] == 255).all()
+
+
+def test_read_cells_splits_words_by_cell(monkeypatch):
+    calls = []
+
+    def image_to_data(img, config, output_type):
+        calls.append(config)
+        # Words of the 1st and 3rd cells, out of order, and an empty box
+        return {'text': ['7', '', '1', '4'], 'left': [30, 0, 16, 16], 'top': [20, 0, 120, 20],
+                'height': [20, 0, 20, 20]}
+
+    monkeypatch.setattr(pytesseract, 'image_to_data', image_to_data)
+    images = [np.zeros((20, 40), np.uint8)] * 3
+    assert read_cells(images, '-l digits', pad=20) == ['4 7', '', '1']
+    assert len(calls) == 1 and '--psm 6' in calls[0]
+
+
+def test_label_digits_one_call_each(monkeypatch):
+    calls = []
+
+    def image_to_string(img, config):
+        calls.append(config)
+        return '{}\n'.format(len(calls) - 1)
+
+    monkeypatch.setattr(pytesseract, 'image_to_string', image_to_string)
+    assert read_each([np.zeros((20, 40), np.uint8)] * 2, '-l digits') == ['0', '1']
+    crops = [np.full((64, 30), 255, np.uint8)] * 3
+    assert Livescore2022()._labelDigits(crops) == [2, 3, 4]
+    assert len(calls) == 5 and all('--psm 8' in config for config in calls)
+
+
+def test_label_digits_in_one_call(monkeypatch):
+    calls = []
+
+    def image_to_data(img, config, output_type):
+        calls.append(img.size)
+        cell_height = img.size[1] // 5
+        return {'text': [str(i) for i in range(5)], 'left': [16] * 5, 'top': [i * cell_height + 20 for i in range(5)],
+                'height': [40] * 5}
+
+    monkeypatch.setattr(pytesseract, 'image_to_data', image_to_data)
+    crops = [np.full((64, 30), 255, np.uint8)] * 5
+    assert Livescore2022(montage_ocr=True)._labelDigits(crops) == [0, 1, 2, 3, 4]
+    assert len(calls) == 1
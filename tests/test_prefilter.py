@@ -0,0 +1,45 @@
+import cv2
+import numpy as np
+import pytest
+
+from livescore import Livescore2017, Livescore2018, Livescore2022, NoOverlayFoundException
+
+
+@pytest.mark.parametrize('livescore_class, name', [
+    (Livescore2017, 'images/2017/01.png'),
+    (Livescore2018, 'images/2018/04.png'),
+    (Livescore2022, 'images/2022/frame1991.png'),
+])
+def test_overlay_frames_are_plausible(livescore_class, name):
+    frc = livescore_class()
+    img = frc._splitFrame(cv2.imread(name), 'bgr')
+    assert frc._isOverlayPlausible(img)
+    gray = frc._splitFrame(cv2.cvtColor(cv2.imread(name), cv2.COLOR_BGR2GRAY), 'gray')
+    assert frc._isOverlayPlausible(gray)
+
+
+def test_frames_without_overlay_are_rejected():
+    frc = Livescore2022(prefilter=True)
+    for img in [cv2.imread('images/2022/frame2040.png'), np.full((720, 1280, 3), 20, np.uint8)]:
+        with pytest.raises(NoOverlayFoundException):
+            frc.read(img)
+    assert frc.getOverlayStats() == {'rejected': 2, 'accepted': 0, 'found': 0, 'skipped': 0}
+
+
+def test_letterboxed_overlay_is_read_by_default():
+    img = cv2.imread('images/2017/01.png')
+    h, w = img.shape[:2]
+    letterboxed = np.zeros_like(img)
+    small = cv2.resize(img, (int(w * 0.8), int(h * 0.8)), interpolation=cv2.INTER_AREA)
+    top, left = (h - small.shape[0]) // 2, (w - small.shape[1]) // 2
+    letterboxed[top:top + small.shape[0], left:left + small.shape[1]] = small
+
+    frc = Livescore2017()
+    frc._parseRawMatchName = lambda img: 'Qualification 1 of 2'  # Without Tesseract
+    details = frc.read(letterboxed)
+    assert details is not None
+    assert abs(frc._transform['scale'] - 0.8) < 0.05
+
+    # The prefilter only looks for overlays across the full frame width
+    with pytest.raises(NoOverlayFoundException):
+        Livescore2017(prefilter=True).read(letterboxed)
@@ -0,0 +1,22 @@
+import colorsys
+
+import numpy as np
+
+from livescore.probes import sample_probes, bgr_to_hsv
+
+
+def test_bgr_to_hsv_matches_colorsys():
+    rng = np.random.default_rng(0)
+    bgr = rng.integers(0, 256, size=(500, 3))
+    hsv = bgr_to_hsv(bgr)
+    for (b, g, r), (h, s, v) in zip(bgr, hsv):
+        expected = colorsys.rgb_to_hsv(r / 255, g / 255, b / 255)
+        assert np.allclose((h, s, v), expected, atol=1e-3) or (s == 0 and np.isclose(expected[1], 0))
+
+
+def test_sample_probes_neighbourhood():
+    img = np.zeros((10, 10, 3), np.uint8)
+    img[5, 5] = (90, 180, 27)
+    points = np.array([[5, 5], [0, 0], [9, 9]])
+    assert np.array_equal(sample_probes(img, points), [[90, 180, 27], [0, 0, 0], [0, 0, 0]])
+    assert np.allclose(sample_probes(img, points, radius=1)[0], np.array([90, 180, 27]) / 9)
@@ -0,0 +1,58 @@
+import threading
+
+import cv2
+import pytest
+
+from livescore import Livescore2022, LivescoreAuto
+from livescore import registry
+
+
+def test_readers_share_assets():
+    frc1 = Livescore2022()
+    frc2 = Livescore2022()
+    assert frc1._template is frc2._template
+    assert frc1._des1 is frc2._des1
+    assert frc1._digits is frc2._digits
+    with pytest.raises(ValueError):
+        frc1._template[0, 0] = 0
+
+    # A different detector gets its own keypoints
+    assert Livescore2022(detector='akaze')._des1 is not frc1._des1
+    assert LivescoreAuto()._template_kps[-1] is frc1._kp1
+
+    # Stream state is still per reader
+    frc1._transform = {'scale': 1.0, 'tx': 0.0, 'ty': 553.0}
+    frc1._match_key = 'qm61'
+    frc1.read(cv2.imread('images/2022/frame1991.png'))
+    assert frc2._transform is None
+    assert frc2._match_key is None
+
+
+def test_auto_reader_shares_template_keypoints():
+    # Whichever reader is built first, the year readers and the auto reader get the same template keypoints
+    registry.clear()
+    auto = LivescoreAuto(detector='brisk')
+    frc = Livescore2022(detector='brisk')
+    assert auto._template_kps[-1] is frc._kp1
+    assert len(auto._template_labels) == len(auto._template_pts)
+
+
+def test_shared_builds_once():
+    builds = []
+
+    def build():
+        builds.append(1)
+        return object()
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(registry.shared(('test', 'once'), build)))
+               for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(builds) == 1
+    assert all(r is results[0] for r in results)
+
+    registry.clear()
+    assert registry.shared(('test', 'once'), build) is not results[0]
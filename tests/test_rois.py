@@ -0,0 +1,19 @@
+import numpy as np
+
+from livescore import Livescore2022
+
+
+def test_roi_strip_matches_individual_crops():
+    frc = Livescore2022()
+    frc._transform = {'scale': 1, 'tx': 0, 'ty': 0}
+    # Adjacent ROIs at OCR height, so the strip is an exact crop and only the thresholding and opening are compared
+    frc._ROIS = {
+        'a': ((10, 0), (70, 64), True),
+        'b': ((70, 0), (100, 64), False),
+        'c': ((100, 30), (180, 94), True),
+    }
+    rng = np.random.default_rng(0)
+    img = rng.integers(0, 256, size=(100, 200, 3), dtype=np.uint8)
+    rois = frc._getRoisThresh(img)
+    for name, (tl, br, white) in frc._ROIS.items():
+        assert np.array_equal(rois.getImage(name), frc._getImgCropThresh(img, tl, br, white=white))
@@ -0,0 +1,27 @@
+import cv2
+import pytest
+
+from livescore import Livescore2022, NoOverlayFoundException
+
+
+def test_searches_back_off_while_overlay_is_gone():
+    frc = Livescore2022(search_backoff=True, prefilter=True)
+    frc._transform = {'scale': 1.0, 'tx': 0.0, 'ty': 553.0}
+    frc._match_key = 'qm61'
+    img = cv2.imread('images/2022/frame1856.png')
+    results = cv2.imread('images/2022/frame2040.png')
+    frc.read(img)
+
+    # 30 seconds of 30 fps video without the overlay
+    for _ in range(900):
+        with pytest.raises(NoOverlayFoundException):
+            frc.read(results)
+    stats = frc.getOverlayStats()
+    assert stats['rejected'] + stats['accepted'] <= 9
+    assert stats['skipped'] >= 891
+
+    # The overlay coming back where it was is picked up by the quick check, without a search
+    frc._findScoreOverlay(frc._splitFrame(img, 'bgr'), False)
+    assert frc._transform == {'scale': 1.0, 'tx': 0.0, 'ty': 553.0}
+    assert frc._is_new_overlay
+    assert frc.getOverlayStats() == stats